@@ -1,5 +1,5 @@
-from fastapi import FastAPI, Request ,UploadFile, File, HTTPException, Form, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi import FastAPI, Request ,UploadFile, File, HTTPException, Form, Depends, Header, Query
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.security import OAuth2PasswordBearer
@@ -8,27 +8,161 @@ import uvicorn
 import mysql.connector
 import os
 import re
+import sys
+import asyncio
+import io
+import json
+import zipfile
+import threading
+from typing import List, Optional
 from dotenv import load_dotenv
 from datetime import datetime
-from src.DocumindAI.ml_pipeline.prediction import PredictionPipeline
-from pathlib import Path
-import shutil
-from uuid import uuid4
+from src.DocumindAI.components.inference_executor import ServiceOverloaded
+from prometheus_client import make_asgi_app
+from src.DocumindAI.config.configuration import ConfigurationManager
+from src.DocumindAI.logging import logger
+import hashlib
 from passlib.context import CryptContext
 
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+IMAGE_CONTENT_TYPES = {"image/tiff", "image/jpeg", "image/png","image/tif","image/jpg"}
+PDF_CONTENT_TYPES = {"application/pdf"}
+DOCUMENT_CONTENT_TYPES = IMAGE_CONTENT_TYPES | PDF_CONTENT_TYPES
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+DOCUMENT_SUFFIXES = ('.tif', '.tiff', '.png', '.jpg', '.jpeg', '.pdf')
+# room for the multipart boundaries and part headers around a single file
+MULTIPART_OVERHEAD = 64 * 1024
 
 dotenv_path = os.path.join(os.path.dirname(__file__), "backend", ".env")
 load_dotenv(dotenv_path)
 
 app = FastAPI(title ="DocumindAI",version="1.0")
+app.mount("/metrics", make_asgi_app())
 
 # Jinja2 template loader
 templates = Jinja2Templates(directory="frontend/templates")
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+config_manager = ConfigurationManager()
+upload_config = config_manager.get_upload_config()
+batch_endpoint_config = config_manager.get_batch_endpoint_config()
+
+# set once the model is loaded and warmed up, read by /health/ready
+model_ready = threading.Event()
+
+def serving():
+    """Imports the ML stack (torch, transformers, PIL) on first use so auth and HTML routes never wait on it."""
+    from src.DocumindAI.ml_pipeline import prediction
+    return prediction
+
+async def load_serving():
+    # the first import takes seconds on a cold worker, keep it off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, serving)
+
+class UploadTooLarge(Exception):
+    pass
+
+class BodySizeLimit:
+    """Refuses upload bodies over a per-route limit before Starlette parses and spools the form.
+
+    A declared Content-Length over the limit is answered with 413 right away,
+    a chunked body is counted as it is received and cut off at the limit.
+    """
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        detail = f"Request body is larger than {limit} bytes"
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            return await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+
+        received = 0
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # raised while the form is parsed, FastAPI lets HTTPException through as it is
+                    raise HTTPException(413, detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(BodySizeLimit, limits={
+    "/predict": upload_config.max_file_size + MULTIPART_OVERHEAD,
+    "/predict/batch": upload_config.max_request_size,
+})
+
+def read_upload(file: UploadFile, max_size: int) -> bytes:
+    """Reads one upload from the file Starlette spooled it to while parsing the form.
+
+    BodySizeLimit has already bounded the whole request, this caps each
+    file: at most max_size + 1 bytes are read back, so an oversized file is
+    refused without being loaded into memory as a whole.
+    """
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLarge(f"{file.filename} is larger than {max_size} bytes")
+    file.file.seek(0)
+    data = file.file.read(max_size + 1)
+    if len(data) > max_size:
+        raise UploadTooLarge(f"{file.filename} is larger than {max_size} bytes")
+    return data
+
+def read_archive_member(archive: zipfile.ZipFile, member: zipfile.ZipInfo, max_size: int) -> bytes:
+    if member.file_size > max_size:
+        raise UploadTooLarge(f"{member.filename} is larger than {max_size} bytes")
+    return archive.read(member)
+
+def overloaded_response(detail: str) -> HTTPException:
+    retry_after = serving().get_inference_executor().config.retry_after_seconds
+    return HTTPException(503, detail, headers={"Retry-After": str(retry_after)})
+
+def pinned_version(pool, header: Optional[str], query: Optional[str]) -> Optional[str]:
+    """Model pool version a request pins with X-Model-Version or ?model_version=, None for the primary model."""
+    from src.DocumindAI.components.model_pool import VersionNotPromoted
+    version = header or query
+    if version is None:
+        return None
+    if version not in pool.config.versions:
+        raise HTTPException(400, f"Unknown model version {version!r}, expected one of {sorted(pool.config.versions)}")
+    try:
+        pool.version_id(version)
+    except VersionNotPromoted as e:
+        raise HTTPException(400, str(e))
+    return version
+
+def cache_version(staged, version: Optional[str]) -> str:
+    return staged.pool.version_id(version) if version else staged.registry.model_version
+
+def warm_up_model():
+    try:
+        registry = serving().get_model_registry()
+        registry.load()
+        registry.warmup()
+        model_ready.set()
+        # new versions are loaded and warmed in the background, then swapped in
+        serving().start_model_watcher()
+    except Exception as e:
+        logger.exception(e)
+
+@app.on_event("startup")
+async def load_model():
+    # import, load and warm up in the background so the auth/HTML routes serve right away
+    loop = asyncio.get_running_loop()
+    app.state.warmup = loop.run_in_executor(None, warm_up_model)
+
+@app.on_event("shutdown")
+async def release_workers():
+    if "src.DocumindAI.ml_pipeline.prediction" in sys.modules:
+        serving().shutdown_serving()
+
 def get_db_connection():
     return mysql.connector.connect(
         host=os.getenv("DB_HOST"),
@@ -60,6 +194,12 @@ class RegisterUser(BaseModel):
             raise ValueError("Weak password")
         return v    
 
+@app.get("/health/ready")
+async def readiness():
+    if not model_ready.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
 # Serve UI at root "/"
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -154,30 +294,136 @@ async def predict_form(request: Request,user_id: int = Depends(get_current_user)
     return templates.TemplateResponse("predict.html", {"request": request,"user": user_id})
 
 @app.post("/predict")
-async def predict(file:UploadFile=File(...),user_id: int=Depends(get_current_user)):
+async def predict(file:UploadFile=File(...),user_id: int=Depends(get_current_user),
+                  x_model_version: Optional[str]=Header(None), model_version: Optional[str]=Query(None)):
     if not file.filename:
         raise HTTPException(status_code=400, detail="Filename missing")
           
-    if file.content_type not in {"image/tiff", "image/jpeg", "image/png","image/tif","image/jpg"}:
+    if file.content_type not in DOCUMENT_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Unsupported file type")
         
-    suffix = Path(file.filename).suffix
-    safe_name = f"{uuid4().hex}{suffix}"  
-    file_path = UPLOAD_DIR/safe_name
+    prediction = await load_serving()
+    from src.DocumindAI.components.batching_engine import BatchQueueFull
+    executor = prediction.get_inference_executor()
+    cache = prediction.get_prediction_cache()
+    staged = prediction.get_staged_pipeline()
+    version = pinned_version(staged.pool, x_model_version, model_version)
 
-    with open(file_path,"wb") as f:
-        shutil.copyfileobj(file.file,f)
+    def load():
+        data = read_upload(file, upload_config.max_file_size)
+        return data, hashlib.sha256(data).hexdigest(), cache_version(staged, version)
+
+    async def classify():
+        data, digest, served_version = await executor.run(load)
+        key = cache.make_key(digest, served_version, staged.settings_fingerprint)
+        # the decode stage opens the image from these bytes, PDFs and TIFFs are classified page by page
+        return await cache.get_or_compute(key, lambda: staged.classify(data, version))
 
     try:
-        pipeline = PredictionPipeline(file_path)
-        prediction, confidence = pipeline.predict()
-        return JSONResponse(content={"label": prediction, "confidence": confidence})
+        result = await asyncio.wait_for(
+            classify(), timeout=executor.config.request_timeout_seconds
+        )
+        return JSONResponse(content=result)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    except (ServiceOverloaded, BatchQueueFull) as e:
+        raise overloaded_response(str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "Prediction timed out")
     except Exception as e:
         raise HTTPException(500, f"Prediction failed: {str(e)}")
-    finally:
-        if file_path.exists():
-            file_path.unlink()
-    
+
+def is_archive(upload: UploadFile) -> bool:
+    return upload.content_type in ZIP_CONTENT_TYPES or upload.filename.lower().endswith(".zip")
+
+def collect_batch_documents(files: List[UploadFile], payloads: List[bytes]) -> list:
+    """Expands the uploads into (filename, loader) pairs, unpacking zip archives member by member."""
+    documents = []
+    for upload, data in zip(files, payloads):
+        if is_archive(upload):
+            archive = zipfile.ZipFile(io.BytesIO(data))
+            for member in archive.infolist():
+                if not member.is_dir() and member.filename.lower().endswith(DOCUMENT_SUFFIXES):
+                    documents.append((member.filename, lambda archive=archive, member=member:
+                                      read_archive_member(archive, member, upload_config.max_file_size)))
+        elif upload.content_type in DOCUMENT_CONTENT_TYPES:
+            documents.append((upload.filename, lambda data=data: data))
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {upload.filename}")
+    return documents
+
+@app.post("/predict/batch")
+async def predict_batch(files: List[UploadFile]=File(...),user_id: int=Depends(get_current_user),
+                        x_model_version: Optional[str]=Header(None), model_version: Optional[str]=Query(None)):
+    # refuse an oversized batch before reading any of it
+    if len(files) > batch_endpoint_config.max_files:
+        raise HTTPException(status_code=413, detail=f"At most {batch_endpoint_config.max_files} documents per batch")
+
+    # read the uploads before streaming starts, the request body is gone once the handler returns;
+    # held together they stay within max_request_size, zip members are only read by their task
+    loop = asyncio.get_running_loop()
+    payloads, total_size = [], 0
+    try:
+        for upload in files:
+            # an archive may be as large as the whole request, max_file_size applies to each member
+            max_size = upload_config.max_request_size if is_archive(upload) else upload_config.max_file_size
+            data = await loop.run_in_executor(None, read_upload, upload, max_size)
+            total_size += len(data)
+            if total_size > upload_config.max_request_size:
+                raise UploadTooLarge(f"Batch is larger than {upload_config.max_request_size} bytes")
+            payloads.append(data)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        documents = collect_batch_documents(files, payloads)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Invalid zip archive")
+
+    if not documents:
+        raise HTTPException(status_code=400, detail="No documents found")
+    if len(documents) > batch_endpoint_config.max_files:
+        raise HTTPException(status_code=413, detail=f"At most {batch_endpoint_config.max_files} documents per batch")
+
+    prediction = await load_serving()
+    from src.DocumindAI.components.batching_engine import BatchQueueFull
+    executor = prediction.get_inference_executor()
+    cache = prediction.get_prediction_cache()
+    staged = prediction.get_staged_pipeline()
+    version = pinned_version(staged.pool, x_model_version, model_version)
+    # keep a single batch from taking every executor slot
+    semaphore = asyncio.Semaphore(batch_endpoint_config.max_concurrency)
+
+    async def classify(filename: str, load):
+        try:
+            async with semaphore:
+                data, served_version = await executor.run(lambda: (load(), cache_version(staged, version)))
+                key = cache.make_key(hashlib.sha256(data).hexdigest(), served_version, staged.settings_fingerprint)
+                result = await asyncio.wait_for(
+                    cache.get_or_compute(key, lambda: staged.classify(data, version)),
+                    timeout=executor.config.request_timeout_seconds
+                )
+            return {"filename": filename, **result}
+        except UploadTooLarge as e:
+            return {"filename": filename, "error": str(e), "retryable": False}
+        except (ServiceOverloaded, BatchQueueFull) as e:
+            return {"filename": filename, "error": str(e), "retryable": True}
+        except asyncio.TimeoutError:
+            return {"filename": filename, "error": "Prediction timed out", "retryable": True}
+        except Exception as e:
+            return {"filename": filename, "error": f"Prediction failed: {str(e)}", "retryable": False}
+
+    async def stream_results():
+        tasks = [asyncio.ensure_future(classify(filename, load)) for filename, load in documents]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield json.dumps(await task) + "\n"
+        finally:
+            # client went away, stop the remaining work
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @app.get("/logout")
 async def logout():
     response = RedirectResponse("/", status_code=302)
@@ -186,4 +432,16 @@ async def logout():
 
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--precision", choices=["fp32", "int8"], default=None,
+                        help="serve the fp32 model or the promoted int8 model (default: serving.precision)")
+    parser.add_argument("--variant", choices=["teacher", "student"], default=None,
+                        help="serve the full model or the distilled student (default: serving.variant)")
+    args = parser.parse_args()
+    # read by ConfigurationManager.get_serving_config when the registry is created
+    if args.precision:
+        os.environ["DOCUMIND_PRECISION"] = args.precision
+    if args.variant:
+        os.environ["DOCUMIND_VARIANT"] = args.variant
     uvicorn.run(app, host="127.0.0.1", port=8010)
\ No newline at end of file
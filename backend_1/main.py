@@ -11,6 +11,9 @@ from datetime import datetime
 from backend.database import get_db, MySQLDatabase
 from backend.models import User, DocumentManager, DocumentCreate
 from backend.auth import AuthService, get_session_token
+from backend.db.config import settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 app = FastAPI(title="DocuMind AI")
 
@@ -116,13 +119,21 @@ async def upload_document(
         file_extension = os.path.splitext(file.filename)[1]
         saved_filename = f"{file_id}{file_extension}"
         
-        upload_dir = "uploads"
+        upload_dir = settings.UPLOAD_DIR
         os.makedirs(upload_dir, exist_ok=True)
         file_path = os.path.join(upload_dir, saved_filename)
         
+        # the document is kept, so stream it to disk chunk by chunk and stop at MAX_FILE_SIZE
+        file_size = 0
         with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > settings.MAX_FILE_SIZE:
+                    break
+                buffer.write(chunk)
+        if file_size > settings.MAX_FILE_SIZE:
+            os.remove(file_path)
+            raise HTTPException(status_code=413, detail=f"File is larger than {settings.MAX_FILE_SIZE} bytes")
         
         # Process with YOUR existing AI engine
         processing_result = await process_with_your_ai(file_path, file.filename, document_type)
@@ -131,7 +142,7 @@ async def upload_document(
         document_data = DocumentCreate(
             original_filename=file.filename,
             file_path=file_path,
-            file_size=len(content),
+            file_size=file_size,
             mime_type=file.content_type,
             document_type=processing_result["document_type"],
             extracted_data=processing_result["extracted_data"],
@@ -146,6 +157,8 @@ async def upload_document(
         
         return RedirectResponse(url="/documents", status_code=303)
         
+    except HTTPException:
+        raise
     except Exception as e:
         return templates.TemplateResponse("upload.html", {
             "request": request,
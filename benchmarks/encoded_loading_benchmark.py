@@ -0,0 +1,93 @@
+"""
+Throughput and peak memory of loading the encoded splits into model-ready
+batches, through the datasets formatter (`dataset[indices]` then
+CompactCollator.expand) versus the memory-mapped loader with worker prefetch.
+
+Every (split, loader) pair runs in a fresh process, so its peak RSS (the
+process's own plus its largest DataLoader worker's) is not inflated by an
+earlier run.
+
+    python -m benchmarks.encoded_loading_benchmark --batch-size 8 --workers 2
+"""
+import os
+import time
+import resource
+import argparse
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from datasets import load_from_disk
+from transformers import AutoProcessor
+from src.DocumindAI.config.configuration import ConfigurationManager
+from src.DocumindAI.utils.compact_encoding import CompactCollator
+from src.DocumindAI.utils.mmap_dataset import MappedSplit, mapped_loader
+from src.DocumindAI.utils.common import save_json, create_directories
+
+
+PREPROCESSOR_DIR = os.path.join("artifacts", "data_preprocessing", "preprocessor")
+OUTPUT_DIR = os.path.join("artifacts", "benchmarks")
+LOADERS = ("datasets", "mmap")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux; for children it is the largest exited DataLoader worker
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return usage / 1024
+
+
+def run(loader: str, path: str, batch_size: int, workers: int, prefetch_factor: int) -> dict:
+    collator = CompactCollator(AutoProcessor.from_pretrained(PREPROCESSOR_DIR, apply_ocr=False))
+    started = time.perf_counter()
+    samples = 0
+
+    if loader == "datasets":
+        dataset = load_from_disk(path)
+        dataset.set_format(type="numpy")
+        for start in range(0, len(dataset), batch_size):
+            batch = collator.expand(dataset[start:start + batch_size])
+            samples += len(batch["input_ids"])
+    else:
+        split = MappedSplit(path, collator)
+        data_loader = mapped_loader(split, batch_size=batch_size, num_workers=workers, prefetch_factor=prefetch_factor)
+        for batch in data_loader:
+            samples += len(batch["input_ids"])
+        # joins the workers, RUSAGE_CHILDREN only counts children that have exited
+        del data_loader
+
+    elapsed = time.perf_counter() - started
+    return {"samples": samples, "seconds": round(elapsed, 3),
+            "samples_per_sec": round(samples / elapsed, 1), "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--splits", nargs="+", default=["train", "val", "test"])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--prefetch-factor", type=int, default=2)
+    args = parser.parse_args()
+
+    data_path = ConfigurationManager().get_model_trainer_config().data_path
+    context = multiprocessing.get_context("spawn")
+
+    results = {}
+    for split in args.splits:
+        path = os.path.join(data_path, split)
+        for loader in LOADERS:
+            # pool processes are not daemonic, so the DataLoader can start its own workers
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[f"{split}/{loader}"] = pool.submit(
+                    run, loader, path, args.batch_size, args.workers, args.prefetch_factor
+                ).result()
+
+    print(f"\n{'split':<8}{'loader':<10}{'samples':>9}{'samples/s':>12}{'peak RSS MB':>14}")
+    for key, row in results.items():
+        split, loader = key.split("/")
+        print(f"{split:<8}{loader:<10}{row['samples']:>9}{row['samples_per_sec']:>12.1f}{row['peak_rss_mb']:>14.1f}")
+
+    create_directories([OUTPUT_DIR])
+    save_json(path=Path(os.path.join(OUTPUT_DIR, "encoded_loading_benchmark.json")), data=results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Cold-start import latency of the web app and of the deferred ML stack.
+
+Each target is imported in a fresh interpreter several times. The median
+wall time and the slowest top-level modules reported by `python -X importtime`
+are appended to artifacts/benchmarks/import_time_history.jsonl, one record
+per run, so startup latency can be tracked across commits.
+
+    python -m benchmarks.import_time_benchmark --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from src.DocumindAI.utils.common import create_directories
+
+
+OUTPUT_DIR = os.path.join("artifacts", "benchmarks")
+HISTORY_FILE = os.path.join(OUTPUT_DIR, "import_time_history.jsonl")
+
+TARGETS = {
+    # what a worker pays before it can serve /login
+    "app": "import app",
+    # what the background warm-up pays before the model can load
+    "ml_stack": "import src.DocumindAI.ml_pipeline.prediction",
+}
+
+
+def time_import(statement: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", statement], check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def slowest_modules(statement: str, top: int) -> list:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            check=True, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # only top-level imports (one space of indentation), nested ones are included in their parent
+        if len(name) - len(name.lstrip()) == 1:
+            modules.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000})
+    return sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+
+
+def git_commit() -> str:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "targets": {},
+    }
+
+    for name, statement in TARGETS.items():
+        timings = [time_import(statement) for _ in range(args.repeat)]
+        record["targets"][name] = {
+            "median_s": round(statistics.median(timings), 3),
+            "min_s": round(min(timings), 3),
+            "max_s": round(max(timings), 3),
+            "slowest_modules": slowest_modules(statement, args.top),
+        }
+        print(f"{name:<10} median {record['targets'][name]['median_s']:.3f}s "
+              f"(min {record['targets'][name]['min_s']:.3f}s, max {record['targets'][name]['max_s']:.3f}s)")
+        for module in record["targets"][name]["slowest_modules"]:
+            print(f"    {module['cumulative_ms']:>9.1f} ms  {module['module']}")
+
+    create_directories([OUTPUT_DIR])
+    with open(HISTORY_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\nAppended results to {HISTORY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
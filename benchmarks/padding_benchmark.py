@@ -0,0 +1,108 @@
+"""
+Per-class inference latency with fixed `max_length` padding versus dynamic,
+length-bucketed padding, on documents from the held-out test split.
+
+    python -m benchmarks.padding_benchmark --samples-per-class 20 --batch-size 8
+"""
+import os
+import time
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from datasets import load_from_disk
+from PIL import Image
+import numpy as np
+from src.DocumindAI.config.configuration import ConfigurationManager
+from src.DocumindAI.components.model_registry import ModelRegistry
+from src.DocumindAI.components.ocr import OCREngine
+from src.DocumindAI.utils.common import save_json, create_directories
+from src.DocumindAI.utils.padding import length_bucket, pad_encodings
+from src.DocumindAI.logging import logger
+
+
+RAW_TEST_SPLIT = os.path.join("artifacts", "data_preprocessing", "raw_dataset", "test")
+OUTPUT_DIR = os.path.join("artifacts", "benchmarks")
+
+
+def encode(registry: ModelRegistry, ocr: OCREngine, path: str, fixed: bool) -> dict:
+    image = Image.open(path).convert("RGB")
+    words, boxes = ocr.ocr_file(path, image)
+    padding = {"padding": "max_length"} if fixed else {}
+    encoding = registry.get().processor(
+        images=image,
+        text=words,
+        boxes=boxes,
+        truncation=True,
+        max_length=registry.config.max_length,
+        return_tensors="pt",
+        **padding
+    )
+    return dict(encoding)
+
+
+def time_per_document(registry: ModelRegistry, encodings: list, batch_size: int, buckets: list = None) -> float:
+    pad_id = registry.get().processor.tokenizer.pad_token_id
+
+    groups = defaultdict(list)
+    for encoding in encodings:
+        key = length_bucket(encoding["input_ids"].shape[1], buckets) if buckets else 0
+        groups[key].append(encoding)
+
+    elapsed = 0.0
+    for group in groups.values():
+        for start in range(0, len(group), batch_size):
+            inputs = pad_encodings(group[start:start + batch_size], pad_id)
+            started = time.perf_counter()
+            registry.forward(inputs)
+            elapsed += time.perf_counter() - started
+
+    return elapsed / len(encodings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples-per-class", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    config = ConfigurationManager()
+    serving_config = config.get_serving_config()
+    buckets = config.get_batching_config().length_buckets
+    registry = ModelRegistry(serving_config)
+    registry.warmup()
+    ocr = OCREngine(config.get_ocr_config())
+
+    dataset = load_from_disk(RAW_TEST_SPLIT)
+    paths_by_class = defaultdict(list)
+    for row in dataset:
+        if len(paths_by_class[row["label"]]) < args.samples_per_class:
+            paths_by_class[row["label"]].append(row["image_path"])
+
+    results = {}
+    for label, paths in sorted(paths_by_class.items()):
+        fixed = [encode(registry, ocr, path, fixed=True) for path in paths]
+        dynamic = [encode(registry, ocr, path, fixed=False) for path in paths]
+
+        fixed_ms = time_per_document(registry, fixed, args.batch_size) * 1000
+        dynamic_ms = time_per_document(registry, dynamic, args.batch_size, buckets) * 1000
+
+        results[label] = {
+            "documents": len(paths),
+            "mean_tokens": float(np.mean([e["input_ids"].shape[1] for e in dynamic])),
+            "fixed_padding_ms_per_doc": round(fixed_ms, 2),
+            "dynamic_padding_ms_per_doc": round(dynamic_ms, 2),
+            "speedup": round(fixed_ms / dynamic_ms, 2),
+        }
+        logger.info(f"{label}: {results[label]}")
+
+    print(f"\n{'class':<15}{'tokens':>8}{'fixed ms':>12}{'dynamic ms':>12}{'speedup':>10}")
+    for label, row in results.items():
+        print(f"{label:<15}{row['mean_tokens']:>8.0f}{row['fixed_padding_ms_per_doc']:>12.1f}"
+              f"{row['dynamic_padding_ms_per_doc']:>12.1f}{row['speedup']:>9.2f}x")
+
+    create_directories([OUTPUT_DIR])
+    save_json(path=Path(os.path.join(OUTPUT_DIR, "padding_benchmark.json")), data=results)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,10 @@ from src.DocumindAI.ml_pipeline.stage_01_data_ingestion import DataIngestionTrai
 from src.DocumindAI.ml_pipeline.stage_02_data_validation import DataValidationTrainingPipeline
 from src.DocumindAI.ml_pipeline.stage_03_data_preprocessing import DataPreprocessingTrainingPipeline
 from src.DocumindAI.ml_pipeline.stage_04_model_trainer import ModelTrainerTrainingPipeline
+from src.DocumindAI.ml_pipeline.stage_04b_onnx_export import OnnxExportPipeline
+from src.DocumindAI.ml_pipeline.stage_04c_visual_classifier import VisualClassifierTrainingPipeline
 from src.DocumindAI.ml_pipeline.stage_05_model_evaluation import ModelEvaluationPipeline
+from src.DocumindAI.ml_pipeline.stage_06_distillation import DistillationTrainingPipeline
 from src.DocumindAI.logging import logger
 
 STAGE_NAME = "Data Ingestion stage"
@@ -48,6 +51,28 @@ except Exception as e:
         logger.exception(e)
         raise e
 
+STAGE_NAME = "ONNX Export stage"
+try: 
+   logger.info(f"*******************")
+   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+   onnx_export = OnnxExportPipeline()
+   onnx_export.main()
+   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+except Exception as e:
+        logger.exception(e)
+        raise e
+
+STAGE_NAME = "Visual Classifier stage"
+try: 
+   logger.info(f"*******************")
+   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+   visual_classifier = VisualClassifierTrainingPipeline()
+   visual_classifier.main()
+   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+except Exception as e:
+        logger.exception(e)
+        raise e
+
 STAGE_NAME = "Model Evaluation stage"
 try: 
    logger.info(f"*******************")
@@ -55,6 +80,17 @@ try:
    model_evaluation = ModelEvaluationPipeline()
    model_evaluation.main()
    logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+except Exception as e:
+        logger.exception(e)
+        raise e
+
+STAGE_NAME = "Distillation stage"
+try: 
+   logger.info(f"*******************")
+   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+   distillation = DistillationTrainingPipeline()
+   distillation.main()
+   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
 except Exception as e:
         logger.exception(e)
         raise e
\ No newline at end of file
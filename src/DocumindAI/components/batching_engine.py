@@ -0,0 +1,144 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from collections import defaultdict
+from prometheus_client import Counter, Gauge, Histogram
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import BatchingConfig
+from src.DocumindAI.components.model_registry import ModelRegistry
+from src.DocumindAI.utils.padding import length_bucket, pad_encodings
+
+
+QUEUE_DEPTH = Gauge("documind_batch_queue_depth", "Requests waiting for a batch slot")
+QUEUE_CAPACITY = Gauge("documind_batch_queue_capacity", "Configured maximum queue depth")
+MAX_BATCH_SIZE = Gauge("documind_batch_max_size", "Configured maximum batch size")
+MAX_WAIT = Gauge("documind_batch_max_wait_seconds", "Configured maximum batch collection wait")
+BATCH_SIZE = Histogram("documind_batch_size", "Requests per forward pass", buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_SEQ_LEN = Histogram("documind_batch_sequence_length", "Padded sequence length per forward pass",
+                          buckets=(32, 64, 128, 256, 384, 512))
+BATCH_WAIT = Histogram("documind_batch_wait_seconds", "Time a request waited in the batch queue")
+BATCH_LATENCY = Histogram("documind_batch_forward_seconds", "Forward pass latency per batch")
+REJECTED = Counter("documind_batch_rejected_total", "Requests rejected because the batch queue was full")
+
+
+class BatchQueueFull(Exception):
+    pass
+
+
+@dataclass
+class BatchRequest:
+    inputs: dict
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent prediction requests for up to `max_wait_ms` or
+    `max_batch_size` requests, groups them into length buckets and runs one
+    forward pass per bucket padded only to its longest sequence, resolving
+    every waiting request's future with its own row of logits.
+    """
+    def __init__(self, registry: ModelRegistry, config: BatchingConfig):
+        self.registry = registry
+        self.config = config
+        self._queue = queue.Queue(maxsize=config.max_queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="documind-batcher", daemon=True)
+
+        QUEUE_CAPACITY.set(config.max_queue_size)
+        MAX_BATCH_SIZE.set(config.max_batch_size)
+        MAX_WAIT.set(config.max_wait_ms / 1000)
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+    def submit(self, inputs: dict) -> Future:
+        request = BatchRequest(inputs=inputs)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            REJECTED.inc()
+            raise BatchQueueFull(f"Batch queue is full ({self.config.max_queue_size} requests waiting)")
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return request.future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _collect(self) -> list:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.config.max_wait_ms / 1000
+        while len(batch) < self.config.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                batch = self._collect()
+                for bucket in self._split_by_length(batch):
+                    self._process(bucket)
+            except Exception as e:
+                # one bad batch must not take the thread, and every later request, down with it
+                logger.exception(e)
+
+    def _split_by_length(self, batch: list) -> list:
+        buckets = defaultdict(list)
+        for request in batch:
+            length = request.inputs["input_ids"].shape[1]
+            buckets[length_bucket(length, self.config.length_buckets)].append(request)
+        return [buckets[key] for key in sorted(buckets)]
+
+    def _process(self, batch: list):
+        # requests whose caller timed out or went away while queued cancel their future, skip them
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for request in batch:
+            BATCH_WAIT.observe(started - request.enqueued_at)
+        BATCH_SIZE.observe(len(batch))
+
+        try:
+            inputs = self.collate([request.inputs for request in batch])
+            logits = self.registry.forward(inputs)
+        except Exception as e:
+            logger.exception(e)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        BATCH_SEQ_LEN.observe(inputs["input_ids"].shape[1])
+        BATCH_LATENCY.observe(time.perf_counter() - started)
+        for i, request in enumerate(batch):
+            if not request.future.done():
+                request.future.set_result(logits[i])
+
+    def collate(self, encodings: list) -> dict:
+        """Pads every input to the longest sequence in the batch and stacks them."""
+        pad_id = self.registry.get().processor.tokenizer.pad_token_id
+        return pad_encodings(encodings, pad_id)
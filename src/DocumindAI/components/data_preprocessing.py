@@ -4,17 +4,71 @@ from transformers import AutoProcessor
 import torch
 from datasets import load_from_disk
 from src.DocumindAI.logging import logger
-from src.DocumindAI.entity.config_entity import DataPreprocessingConfig
+from src.DocumindAI.entity.config_entity import DataPreprocessingConfig, OCRConfig
+from src.DocumindAI.components.ocr import OCREngine
+from src.DocumindAI.components.encoding_cache import EncodingCache, image_fingerprint, FINGERPRINT_COLUMN
+from src.DocumindAI.utils.compact_encoding import compact_features, ENCODING_FORMAT
 from PIL import Image
+import numpy as np
+import transformers
+import math
 import json
 
+
+MANIFEST_FILE = "manifest.json"
+
+_worker_preprocessor = None
+_worker_ocr = None
+
+
+def encode_batch(examples, model: str, ocr_config: OCRConfig, max_length: int, single_threaded: bool = False):
+    """Decode, OCR and tokenize one batch into compact rows. Labels are added after encoding, they are not part of the cached rows.
+
+    Pixels are kept as resized uint8 and sequences unpadded, CompactCollator
+    rescales, normalizes and pads them when a batch is loaded.
+
+    A module-level function so `ds.map(num_proc=...)` pickles only its
+    arguments; each worker process builds its own processor and OCR engine
+    on its first batch.
+    """
+    global _worker_preprocessor, _worker_ocr
+    if _worker_preprocessor is None:
+        if single_threaded:
+            # one tesseract and torch thread per process, the workers provide the parallelism
+            os.environ["OMP_THREAD_LIMIT"] = "1"
+            torch.set_num_threads(1)
+        _worker_preprocessor = AutoProcessor.from_pretrained(model, apply_ocr=False)
+        _worker_ocr = OCREngine(ocr_config)
+
+    images = [Image.open(path).convert("RGB") for path in examples['image_path']]
+    ocr_results = [_worker_ocr.ocr_file(path, image) for path, image in zip(examples['image_path'], images)]
+    tokens = _worker_preprocessor.tokenizer(
+        text=[words for words, _ in ocr_results],
+        boxes=[boxes for _, boxes in ocr_results],
+        truncation=True,
+        max_length=max_length
+    )
+    pixels = _worker_preprocessor.image_processor(
+        images, do_rescale=False, do_normalize=False, return_tensors="np"
+    )["pixel_values"]
+    return {
+        "input_ids": [np.asarray(ids, dtype=np.int32) for ids in tokens["input_ids"]],
+        "bbox": [np.asarray(boxes, dtype=np.int16) for boxes in tokens["bbox"]],
+        "pixel_values": np.clip(np.rint(pixels), 0, 255).astype(np.uint8),
+    }
+
+
 class DataPreprocessing:
-    def __init__(self, config: DataPreprocessingConfig):
+    def __init__(self, config: DataPreprocessingConfig, ocr_config: OCRConfig):
         self.config = config
-        self.preprocessor = AutoProcessor.from_pretrained(self.config.model,apply_ocr=True)
+        # OCR runs through the cached OCREngine, the processor only tokenizes
+        self.preprocessor = AutoProcessor.from_pretrained(self.config.model,apply_ocr=False)
+        self.ocr_config = ocr_config
+        self.encoding_cache = EncodingCache(self.config.encoding_cache_dir)
 
         self.raw_dataset = {}
         self.encoded_dataset = {}
+        self.fingerprints = {}
         self.label2id = {}
         self.id2label = {}
         self.num_labels = 0
@@ -47,9 +101,13 @@ class DataPreprocessing:
             'test': Dataset.from_list(test_data)
         }
 
-        self.raw_dataset['train'] = self.raw_dataset['train'].shuffle(seed=42).select(range(1800))
-        self.raw_dataset['val'] = self.raw_dataset['val'].shuffle(seed=42).select(range(600))
-        self.raw_dataset['test'] = self.raw_dataset['test'].shuffle(seed=42).select(range(600))
+        # subset sizes come from params.yaml, null keeps the whole split
+        sizes = {'train': self.config.train_samples, 'val': self.config.val_samples, 'test': self.config.test_samples}
+        for split_name, size in sizes.items():
+            ds = self.raw_dataset[split_name].shuffle(seed=42)
+            if size is not None:
+                ds = ds.select(range(min(size, len(ds))))
+            self.raw_dataset[split_name] = ds.flatten_indices()
 
         print("\n✅ Raw datasets loaded and shuffled.")  
 
@@ -72,29 +130,65 @@ class DataPreprocessing:
             for split in self.raw_dataset
         }
 
-    def preprocess_data(self, examples):
-        images = [Image.open(path).convert("RGB") for path in examples['image_path']]
-        encoding = self.preprocessor(
-            images=images,
-            padding="max_length",
-            truncation=True,
-            max_length=self.config.max_length,
-            return_tensors="pt"
-        )
-        encoding['labels'] = torch.tensor(examples['labels'], dtype=torch.long)
-        return encoding
+    def num_workers(self) -> int:
+        return self.config.num_workers or os.cpu_count() or 1
+
+    def encoding_settings(self) -> str:
+        """Everything besides the image that changes an encoded row; batch_size and num_workers do not."""
+        return json.dumps({
+            "model": str(self.config.model),
+            "max_length": self.config.max_length,
+            "image_processor": self.preprocessor.image_processor.to_dict(),
+            "vocab_size": len(self.preprocessor.tokenizer),
+            "ocr": OCREngine(self.ocr_config).settings,
+            "transformers": transformers.__version__,
+            "format": ENCODING_FORMAT,
+        }, sort_keys=True, default=str)
 
     def apply_preprocessing(self):
-        print("\nApplying LayoutLMv2 Processor (OCR, Fusion, and Tokenization)...")
+        num_workers = self.num_workers()
+        num_proc = num_workers if num_workers > 1 else None
+        settings = self.encoding_settings()
+        print(f"\nApplying LayoutLMv2 Processor (OCR, Fusion, and Tokenization) on {num_workers} processes...")
+        fn_kwargs = {
+            "model": self.config.model,
+            "ocr_config": self.ocr_config,
+            "max_length": self.config.max_length,
+            "single_threaded": num_workers > 1,
+        }
+        features = compact_features(self.preprocessor.image_processor.size)
+        features[FINGERPRINT_COLUMN] = Value("string")
+        self.fingerprints = {}
         for split_name, ds in self.raw_dataset.items():
-            self.encoded_dataset[split_name] = ds.map(
-                self.preprocess_data,
-                batched=True,
-                batch_size=self.config.batch_size,
-                remove_columns=ds.column_names,
-                desc=f"Preprocessing {split_name} Split"
-            )
-            self.encoded_dataset[split_name].set_format(type="torch")
+            fingerprints = ds.map(
+                image_fingerprint, fn_kwargs={"settings": settings}, batched=True, num_proc=num_proc,
+                remove_columns=ds.column_names, desc=f"Fingerprinting {split_name} Split"
+            )[FINGERPRINT_COLUMN]
+            self.fingerprints[split_name] = fingerprints
+
+            # only images no earlier run has encoded with these settings go through OCR and the processor
+            todo = self.encoding_cache.missing(fingerprints)
+            print(f"{split_name}: {len(ds) - len(todo)} rows reused, {len(todo)} to encode")
+            # encoded shard_size rows at a time and written out, so memory stays flat however large the split
+            for start in range(0, len(todo), self.config.shard_size):
+                chunk = todo[start:start + self.config.shard_size]
+                pending = ds.select(chunk).add_column(FINGERPRINT_COLUMN, [fingerprints[i] for i in chunk])
+                # each worker gets a contiguous shard and the shards are concatenated in order,
+                # so the rows come out the same whatever the number of workers
+                encoded = pending.map(
+                    encode_batch,
+                    fn_kwargs=fn_kwargs,
+                    batched=True,
+                    batch_size=self.config.batch_size,
+                    num_proc=min(num_proc, len(chunk)) if num_proc else None,
+                    remove_columns=ds.column_names,
+                    features=features,
+                    desc=f"Preprocessing {split_name} Split"
+                )
+                self.encoding_cache.add(encoded)
+
+            self.encoded_dataset[split_name] = self.encoding_cache.assemble(fingerprints, columns={"labels": ds["labels"]})
+            self.encoded_dataset[split_name].set_format(type="numpy")
 
         print("\n✅ Preprocessing complete.")
         print(f"Number of classes: {self.num_labels}")
@@ -104,8 +198,14 @@ class DataPreprocessing:
         os.makedirs(save_encoded_path, exist_ok=True)
 
         print("\nSaving encoded datasets...")
+        manifest = {}
         for split_name, ds in self.encoded_dataset.items():
-            ds.save_to_disk(f"{save_encoded_path}/{split_name}")
+            # shard_size rows per Arrow file, the trainer streams the train split shard by shard
+            num_shards = max(1, math.ceil(len(ds) / self.config.shard_size))
+            ds.save_to_disk(f"{save_encoded_path}/{split_name}", num_shards=num_shards)
+            manifest[split_name] = {"num_rows": len(ds), "num_shards": num_shards, "format": ENCODING_FORMAT}
+        with open(os.path.join(save_encoded_path, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=4)
         print("✅ Encoded dataset saved successfully!")
 
         print("\nSaving raw datasets...")
@@ -124,6 +224,8 @@ class DataPreprocessing:
             save_raw_path=os.path.join(base_dir, "raw_dataset"),
             save_encoded_path=os.path.join(base_dir, "encoded_data")
         )
+        # after saving, the splits no longer read from the shards being dropped
+        self.encoding_cache.prune([f for fingerprints in self.fingerprints.values() for f in fingerprints])
 
         # Save preprocessor separately
         preprocessor_dir = os.path.join(base_dir, "preprocessor")
@@ -0,0 +1,189 @@
+import os
+import time
+import torch
+import numpy as np
+import torch.nn.functional as F
+from pathlib import Path
+from datasets import load_from_disk
+from sklearn.metrics import accuracy_score, f1_score
+from transformers import AutoProcessor, LayoutLMv3ForSequenceClassification
+from transformers import TrainingArguments, Trainer
+from src.DocumindAI.entity.config_entity import DistillationConfig
+from src.DocumindAI.utils.common import save_json
+from src.DocumindAI.utils.compact_encoding import CompactCollator, sequence_lengths
+from src.DocumindAI.logging import logger
+
+
+class DistillationTrainer(Trainer):
+    """Trainer whose loss blends KL to the teacher's softened logits with the usual cross entropy."""
+    def __init__(self, *args, temperature: float, alpha: float, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        teacher_logits = inputs.pop("teacher_logits")
+        outputs = model(**inputs)
+
+        t = self.temperature
+        soft_loss = F.kl_div(
+            F.log_softmax(outputs.logits / t, dim=-1),
+            F.softmax(teacher_logits / t, dim=-1),
+            reduction="batchmean"
+        ) * t * t
+        loss = self.alpha * soft_loss + (1 - self.alpha) * outputs.loss
+        return (loss, outputs) if return_outputs else loss
+
+
+class Distillation:
+    def __init__(self, config: DistillationConfig):
+        self.config = config
+        self.teacher = None
+        self.student = None
+        self.encoded_dataset = {}
+        self.collator = CompactCollator(AutoProcessor.from_pretrained(self.config.teacher_model_path))
+
+    def load_encoded_dataset(self):
+        for split in ("train", "val", "test"):
+            self.encoded_dataset[split] = load_from_disk(os.path.join(self.config.data_path, split))
+            self.encoded_dataset[split].set_format(type="numpy")
+
+    def load_teacher(self):
+        self.teacher = LayoutLMv3ForSequenceClassification.from_pretrained(self.config.teacher_model_path)
+        self.teacher.eval()
+
+    def batches(self, dataset):
+        """Length-sorted index batches, so each one pads only to its own longest document."""
+        lengths = sequence_lengths(dataset)
+        order = sorted(range(len(dataset)), key=lambda i: lengths[i])
+        for start in range(0, len(order), self.config.per_device_train_batch_size):
+            yield order[start:start + self.config.per_device_train_batch_size]
+
+    def logits(self, model, dataset) -> torch.Tensor:
+        out = torch.empty((len(dataset), model.config.num_labels))
+        with torch.no_grad():
+            for indices in self.batches(dataset):
+                batch = self.collator.expand(dataset[indices])
+                batch.pop("labels")
+                out[indices] = model(**batch).logits
+        return out
+
+    def add_teacher_logits(self):
+        """Scores train and val with the teacher once, the student then trains against the stored logits."""
+        for split in ("train", "val"):
+            print(f"Computing teacher logits for the {split} split")
+            logits = self.logits(self.teacher, self.encoded_dataset[split])
+            self.encoded_dataset[split] = self.encoded_dataset[split].add_column("teacher_logits", logits.tolist())
+            self.encoded_dataset[split].set_format(type="numpy")
+
+    def initialize_student(self):
+        """Teacher config with fewer, narrower layers.
+
+        The student starts from every teacher tensor whose shape it shares:
+        the embeddings and an evenly spaced subset of the encoder layers when
+        the hidden size is unchanged, little or nothing when it is narrower.
+        """
+        config = self.teacher.config.to_dict()
+        config.update(
+            num_hidden_layers=self.config.num_hidden_layers,
+            hidden_size=self.config.hidden_size,
+            num_attention_heads=self.config.num_attention_heads,
+            intermediate_size=self.config.intermediate_size,
+            # the spatial embedding concatenates 4 coordinate and 2 shape embeddings into hidden_size
+            coordinate_size=self.config.hidden_size // 6,
+            shape_size=self.config.hidden_size // 6,
+        )
+        student_config = type(self.teacher.config).from_dict(config)
+        self.student = LayoutLMv3ForSequenceClassification(student_config)
+
+        keep = np.linspace(0, self.teacher.config.num_hidden_layers - 1, self.config.num_hidden_layers).round().astype(int)
+        state_dict = self.teacher.state_dict()
+        for student_index, teacher_index in enumerate(keep):
+            prefix = f"layoutlmv3.encoder.layer.{teacher_index}."
+            for name in [n for n in state_dict if n.startswith(prefix)]:
+                state_dict[name.replace(prefix, f"layoutlmv3.encoder.layer.{student_index}.")] = state_dict.pop(name)
+
+        # narrower feed-forward layers or fewer heads (rel_pos_bias) change some shapes, those start from scratch
+        student_state = self.student.state_dict()
+        compatible = {name: tensor for name, tensor in state_dict.items()
+                      if name in student_state and student_state[name].shape == tensor.shape}
+        self.student.load_state_dict(compatible, strict=False)
+        logger.info(f"Student initialized from teacher layers {keep.tolist()}, "
+                    f"{len(compatible)} of {len(student_state)} tensors copied")
+
+        total = sum(p.numel() for p in self.student.parameters())
+        print(f"✅ Student initialized with {total / 1e6:.1f}M parameters")
+
+    def train_student(self):
+        training_args = TrainingArguments(
+            output_dir=os.path.join(self.config.root_dir, "checkpoints"),
+            num_train_epochs=self.config.num_train_epochs,
+            per_device_train_batch_size=self.config.per_device_train_batch_size,
+            per_device_eval_batch_size=self.config.per_device_train_batch_size,
+            learning_rate=self.config.learning_rate,
+            eval_strategy="epoch",
+            save_strategy="epoch",
+            save_total_limit=1,
+            load_best_model_at_end=True,
+            remove_unused_columns=False,
+            save_safetensors=True,
+            report_to=None
+        )
+        trainer = DistillationTrainer(
+            model=self.student,
+            args=training_args,
+            train_dataset=self.encoded_dataset["train"],
+            eval_dataset=self.encoded_dataset["val"],
+            temperature=self.config.temperature,
+            alpha=self.config.alpha,
+            data_collator=self.collator,
+        )
+        print("Starting student training...")
+        trainer.train()
+        self.student = trainer.model
+        self.student.eval()
+
+    def save_student(self):
+        # same layout as the teacher so ModelRegistry can load either directory
+        os.makedirs(self.config.student_model_path, exist_ok=True)
+        self.student.save_pretrained(self.config.student_model_path, safe_serialization=True)
+        AutoProcessor.from_pretrained(self.config.teacher_model_path).save_pretrained(self.config.student_model_path)
+        logger.info(f"Student model saved at: {self.config.student_model_path}")
+
+    def latency_ms(self, model, dataset) -> float:
+        """Mean batch-size-1 forward latency, the way a single /predict request runs it."""
+        timings = []
+        with torch.no_grad():
+            for i in range(min(self.config.latency_samples, len(dataset))):
+                inputs = self.collator.expand(dataset[[i]])
+                inputs.pop("labels")
+                started = time.perf_counter()
+                model(**inputs)
+                timings.append((time.perf_counter() - started) * 1000)
+        return float(np.mean(timings))
+
+    def compare(self):
+        test = self.encoded_dataset["test"]
+        labels = test["labels"].tolist()
+        comparison = {}
+        for name, model in (("teacher", self.teacher), ("student", self.student)):
+            preds = self.logits(model, test).argmax(dim=-1).tolist()
+            comparison[f"{name}_accuracy"] = float(accuracy_score(labels, preds))
+            comparison[f"{name}_f1_score"] = float(f1_score(labels, preds, average="weighted"))
+            comparison[f"{name}_mean_latency_ms"] = self.latency_ms(model, test)
+            comparison[f"{name}_parameters"] = sum(p.numel() for p in model.parameters())
+        comparison["student_speedup"] = comparison["teacher_mean_latency_ms"] / comparison["student_mean_latency_ms"]
+
+        save_json(path=Path(os.path.join(self.config.root_dir, "comparison.json")), data=comparison)
+
+        print(f"✅ Student reaches {comparison['student_accuracy']:.4f} accuracy vs "
+              f"{comparison['teacher_accuracy']:.4f}, {comparison['student_speedup']:.2f}x faster")
+
+    def distill(self):
+        self.load_encoded_dataset()
+        self.load_teacher()
+        self.add_teacher_logits()
+        self.initialize_student()
+        self.train_student()
+        self.save_student()
+        self.compare()
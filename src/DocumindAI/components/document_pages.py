@@ -0,0 +1,121 @@
+import io
+import re
+import tempfile
+import subprocess
+from html import unescape
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator
+from PIL import Image, ImageSequence
+from src.DocumindAI.components.page_filter import BLANK_PAGE, NON_DOCUMENT
+from src.DocumindAI.logging import logger
+
+
+PDF_MAGIC = b"%PDF-"
+TIFF_MAGIC = (b"II*\x00", b"MM\x00*")
+
+PAGE_PATTERN = re.compile(r'<page width="([\d.]+)" height="([\d.]+)">')
+WORD_PATTERN = re.compile(r'<word xMin="([\d.]+)" yMin="([\d.]+)" xMax="([\d.]+)" yMax="([\d.]+)">(.*?)</word>')
+
+
+@dataclass
+class Page:
+    number: int
+    image: Image.Image
+    # filled from the PDF text layer when there is one, otherwise OCR runs
+    words: list = None
+    boxes: list = None
+
+
+def is_pdf(data: bytes) -> bool:
+    return data[:5] == PDF_MAGIC
+
+
+def is_multipage(data: bytes) -> bool:
+    """PDFs and TIFFs with more than one frame are classified page by page, anything else as a single image."""
+    if is_pdf(data):
+        return True
+    if data[:4] not in TIFF_MAGIC:
+        return False
+    try:
+        # only reads the frame directories, not the pixels
+        with Image.open(io.BytesIO(data)) as tiff:
+            return getattr(tiff, "n_frames", 1) > 1
+    except OSError:
+        return False
+
+
+def tiff_pages(data: bytes) -> Iterator[Page]:
+    with Image.open(io.BytesIO(data)) as tiff:
+        for number, frame in enumerate(ImageSequence.Iterator(tiff), start=1):
+            yield Page(number, frame.convert("RGB"))
+
+
+def pdf_text_layer(path: str, number: int):
+    """Words and 0-1000 normalized boxes of one page from `pdftotext -bbox`, empty if the page has no text layer."""
+    result = subprocess.run(
+        ["pdftotext", "-bbox", "-f", str(number), "-l", str(number), path, "-"],
+        capture_output=True, text=True, check=True
+    )
+    page = PAGE_PATTERN.search(result.stdout)
+    if page is None:
+        return [], []
+
+    width, height = float(page.group(1)), float(page.group(2))
+    words, boxes = [], []
+    for x0, y0, x1, y1, text in WORD_PATTERN.findall(result.stdout):
+        text = unescape(text).strip()
+        if not text:
+            continue
+        words.append(text)
+        boxes.append([
+            min(1000, max(0, int(1000 * float(x0) / width))),
+            min(1000, max(0, int(1000 * float(y0) / height))),
+            min(1000, max(0, int(1000 * float(x1) / width))),
+            min(1000, max(0, int(1000 * float(y1) / height))),
+        ])
+    return words, boxes
+
+
+def pdf_pages(data: bytes, dpi: int) -> Iterator[Page]:
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    # poppler only reads from a file, the temp copy lives as long as the iteration
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(data)
+        f.flush()
+        count = pdfinfo_from_path(f.name)["Pages"]
+        for number in range(1, count + 1):
+            image = convert_from_path(f.name, dpi=dpi, first_page=number, last_page=number)[0].convert("RGB")
+            try:
+                words, boxes = pdf_text_layer(f.name, number)
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.warning(f"pdftotext failed on page {number}, falling back to OCR: {e}")
+                words, boxes = [], []
+            yield Page(number, image, words or None, boxes or None)
+
+
+def iter_pages(data: bytes, dpi: int) -> Iterator[Page]:
+    """Yields the pages of a PDF or TIFF one at a time, only the current page is decoded."""
+    return pdf_pages(data, dpi) if is_pdf(data) else tiff_pages(data)
+
+
+def aggregate(pages: list) -> dict:
+    """Document label from per-page results, a confidence-weighted vote over the pages with content.
+
+    Blank separators and non-document pages do not vote; a document made only
+    of those gets the most common of their labels.
+    """
+    votes, content_pages = {}, 0
+    for page in pages:
+        if page["label"] in (BLANK_PAGE, NON_DOCUMENT):
+            continue
+        content_pages += 1
+        votes[page["label"]] = votes.get(page["label"], 0.0) + page["confidence"]
+
+    if not votes:
+        label = Counter(page["label"] for page in pages).most_common(1)[0][0]
+        return {"label": label, "confidence": 1.0}
+
+    label = max(votes, key=votes.get)
+    return {"label": label, "confidence": votes[label] / content_pages}
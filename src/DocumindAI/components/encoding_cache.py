@@ -0,0 +1,112 @@
+import os
+import glob
+import shutil
+import hashlib
+from datasets import Dataset, load_from_disk, concatenate_datasets
+from src.DocumindAI.logging import logger
+
+
+FINGERPRINT_COLUMN = "fingerprint"
+
+
+def image_fingerprint(examples, settings: str):
+    """Content hash of each image file combined with the processor and OCR settings that encoded it."""
+    fingerprints = []
+    for path in examples['image_path']:
+        digest = hashlib.sha256(settings.encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        fingerprints.append(digest.hexdigest())
+    return {FINGERPRINT_COLUMN: fingerprints}
+
+
+class EncodingCache:
+    """
+    Encoded rows kept across preprocessing runs as append-only shards on
+    disk, each row tagged with the fingerprint of the image and settings
+    that produced it.
+
+    A run encodes only the fingerprints no shard holds yet, writes them as
+    one new shard and assembles each split by selecting its rows from the
+    memory-mapped shards. Shards no split uses anymore are deleted.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.shards = {}
+        self.index = {}
+        for path in sorted(glob.glob(os.path.join(cache_dir, "shard-*"))):
+            if path.endswith(".tmp"):
+                # left behind by an interrupted run
+                shutil.rmtree(path)
+                continue
+            # datasets cache files an earlier version wrote next to the shard, never read again
+            for stale in glob.glob(os.path.join(path, "cache-*.arrow")):
+                os.remove(stale)
+            self._add_shard(path)
+        logger.info(f"Encoding cache holds {len(self.index)} rows in {len(self.shards)} shards")
+
+    def _add_shard(self, path: str):
+        name = os.path.basename(path)
+        shard = load_from_disk(path)
+        self.shards[name] = shard
+        for row, fingerprint in enumerate(shard[FINGERPRINT_COLUMN]):
+            self.index.setdefault(fingerprint, (name, row))
+
+    def missing(self, fingerprints: list) -> list:
+        """Positions of the fingerprints that still have to be encoded, each distinct one once."""
+        seen, positions = set(), []
+        for position, fingerprint in enumerate(fingerprints):
+            if fingerprint not in self.index and fingerprint not in seen:
+                seen.add(fingerprint)
+                positions.append(position)
+        return positions
+
+    def add(self, encoded: Dataset):
+        """Stores newly encoded rows, which must carry the fingerprint column, as a new shard."""
+        if len(encoded) == 0:
+            return
+        existing = [int(name.split("-")[1]) for name in self.shards]
+        name = f"shard-{max(existing, default=-1) + 1:05d}"
+        path = os.path.join(self.cache_dir, name)
+        # written aside and renamed, a killed run never leaves a half-written shard behind
+        encoded.save_to_disk(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        self._add_shard(path)
+
+    def assemble(self, fingerprints: list, columns: dict = None) -> Dataset:
+        """The cached rows for fingerprints, in the same order, without the fingerprint column.
+
+        columns holds extra values aligned with fingerprints, such as labels.
+        They are attached to each shard in memory before the rows are
+        selected, adding them to the selection would flatten it into a full
+        copy written next to the shard.
+        """
+        names = sorted({self.index[fingerprint][0] for fingerprint in fingerprints})
+        offsets, total = {}, 0
+        for name in names:
+            offsets[name] = total
+            total += len(self.shards[name])
+
+        shards = {name: self.shards[name] for name in names}
+        for column, values in (columns or {}).items():
+            per_shard = {name: [None] * len(shard) for name, shard in shards.items()}
+            for fingerprint, value in zip(fingerprints, values):
+                name, row = self.index[fingerprint]
+                if per_shard[name][row] not in (None, value):
+                    logger.warning(f"Duplicate image {fingerprint} has conflicting {column}, keeping {value}")
+                per_shard[name][row] = value
+            shards = {name: shard.add_column(column, per_shard[name]) for name, shard in shards.items()}
+
+        combined = concatenate_datasets([shards[name] for name in names])
+        indices = [offsets[name] + row for name, row in (self.index[fingerprint] for fingerprint in fingerprints)]
+        return combined.select(indices).remove_columns(FINGERPRINT_COLUMN)
+
+    def prune(self, fingerprints: list):
+        """Deletes shards that hold none of the fingerprints still in use."""
+        used = {self.index[fingerprint][0] for fingerprint in fingerprints}
+        for name in [name for name in self.shards if name not in used]:
+            del self.shards[name]
+            shutil.rmtree(os.path.join(self.cache_dir, name))
+            logger.info(f"Encoding cache dropped unused {name}")
+        self.index = {fingerprint: entry for fingerprint, entry in self.index.items() if entry[0] in self.shards}
@@ -0,0 +1,34 @@
+import torch
+
+
+class TorchBackend:
+    """Runs the classifier through PyTorch and returns logits."""
+    name = "torch"
+
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, inputs: dict) -> torch.Tensor:
+        with torch.inference_mode():
+            return self.model(**inputs).logits
+
+
+class OnnxBackend:
+    """Runs an exported classifier through ONNX Runtime on CPU and returns logits as a tensor."""
+    name = "onnx"
+
+    def __init__(self, onnx_path: str, intra_op_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, inputs: dict) -> torch.Tensor:
+        feeds = {name: inputs[name].numpy() for name in self.input_names}
+        logits = self.session.run(["logits"], feeds)[0]
+        return torch.from_numpy(logits)
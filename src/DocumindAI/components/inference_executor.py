@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import Counter, Gauge
+from src.DocumindAI.entity.config_entity import ExecutorConfig
+
+
+IN_FLIGHT = Gauge("documind_executor_in_flight", "Jobs running or waiting in the inference executor")
+CAPACITY = Gauge("documind_executor_capacity", "Maximum jobs admitted to the inference executor")
+REJECTED = Counter("documind_executor_rejected_total", "Jobs rejected because the inference executor was saturated")
+
+
+class ServiceOverloaded(Exception):
+    pass
+
+
+class InferenceExecutor:
+    """
+    Runs blocking decode/OCR work on a dedicated thread pool. Admission is
+    bounded to `workers + max_pending` jobs; anything beyond that fails fast
+    with ServiceOverloaded instead of queueing behind the event loop.
+    """
+    def __init__(self, config: ExecutorConfig):
+        self.config = config
+        self._pool = ThreadPoolExecutor(max_workers=config.workers, thread_name_prefix="documind-inference")
+        self._slots = threading.BoundedSemaphore(config.workers + config.max_pending)
+
+        CAPACITY.set(config.workers + config.max_pending)
+
+    def _release(self, _):
+        self._slots.release()
+        IN_FLIGHT.dec()
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            REJECTED.inc()
+            raise ServiceOverloaded("Inference executor is saturated, retry later")
+
+        IN_FLIGHT.inc()
+        try:
+            future = self._pool.submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        # the slot is only freed once the job really finishes, even if the caller timed out
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
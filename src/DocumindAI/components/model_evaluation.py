@@ -4,18 +4,29 @@ import numpy as np
 from sklearn.metrics import accuracy_score, f1_score
 import mlflow
 from mlflow.tracking import MlflowClient
-from src.DocumindAI.entity.config_entity import EvaluationConfig
+from src.DocumindAI.entity.config_entity import EvaluationConfig, OCRConfig
 from datasets import load_from_disk
 from pathlib import Path
-from src.DocumindAI.utils.common import save_json
+from src.DocumindAI.utils.common import save_json, create_directories, get_weights_fingerprint
+from src.DocumindAI.utils.compact_encoding import CompactCollator
+from src.DocumindAI.utils.mmap_dataset import MappedSplit, mapped_loader
+from src.DocumindAI.components.model_quantization import load_quantized_model
+from src.DocumindAI.components.visual_classifier import VisualGate
+from src.DocumindAI.components.ocr import OCREngine
+from PIL import Image
+from src.DocumindAI.logging import logger
+import os
+import time
 
 
 class ModelEvaluation:
-    def __init__(self, config: EvaluationConfig):
+    def __init__(self, config: EvaluationConfig, ocr_config: OCRConfig):
         self.config = config
+        self.ocr_config = ocr_config
         self.client = MlflowClient()
         self.metrics = {}
         self.model = None
+        self.preds = None
 
     def load_model_and_processor(self):
         self.processor = AutoProcessor.from_pretrained(
@@ -29,32 +40,46 @@ class ModelEvaluation:
         self.model.eval() 
 
     def load_dataset(self):
-        self.dataset = load_from_disk(self.config.data_path)
-        self.eval_dataset = self.dataset["test"]
-
-    def evaluation(self):
-        self.load_model_and_processor()
-        self.load_dataset()
-        preds, labels, confidence = [],[],[]
+        # data_path holds one directory per split, not a DatasetDict
+        self.eval_dataset = MappedSplit(os.path.join(self.config.data_path, "test"), CompactCollator(self.processor))
+
+    def score(self, model):
+        n = len(self.eval_dataset)
+        batch_size = self.config.all_params.per_device_eval_batch_size
+        preds, labels, confidence = [None]*n, [None]*n, [None]*n
+
+        # length-sorted batches, each padded only to its longest document
+        lengths = self.eval_dataset.lengths()
+        order = sorted(range(n), key=lambda i: lengths[i])
+        batches = [order[start:start + batch_size] for start in range(0, n, batch_size)]
+        # workers gather and expand the next batches from the mapped files while the model runs
+        loader = mapped_loader(
+            self.eval_dataset,
+            batches=batches,
+            num_workers=self.config.all_params.dataloader_num_workers,
+            prefetch_factor=self.config.all_params.dataloader_prefetch_factor
+        )
 
         with torch.no_grad():
-            for batch in self.eval_dataset:
+            for indices, batch in zip(batches, loader):
+                batch_labels = batch.pop("labels")
 
-                inputs = {
-                    k:torch.tensor(v).unsqueeze(0) 
-                    for k,v in batch.items() if k!="labels"
-                }
-
-                outputs = self.model(**inputs)
+                outputs = model(**batch)
                 logits = outputs.logits
                 probs = torch.softmax(logits,dim=-1)
 
-                predicted_id = probs.argmax(dim=-1).item()
-                cnf = probs.max().item()
+                for row, i in enumerate(indices):
+                    preds[i] = int(probs[row].argmax().item())
+                    confidence[i] = float(probs[row].max().item())
+                    labels[i] = int(batch_labels[row].item())
 
-                preds.append(predicted_id)
-                confidence.append(cnf)
-                labels.append(batch["labels"])
+        return preds, labels, confidence
+
+    def evaluation(self):
+        self.load_model_and_processor()
+        self.load_dataset()
+        preds, labels, confidence = self.score(self.model)
+        self.preds = preds
 
         acc = accuracy_score(labels,preds)
         f1 = f1_score(labels,preds,average="weighted")
@@ -67,8 +92,102 @@ class ModelEvaluation:
 
         self.save_metrics(self.metrics)
 
+    def evaluate_quantized(self):
+        """Scores the int8 model on the test split and only promotes it if F1 stays within max_f1_drop."""
+        if not os.path.isdir(self.config.quantized_model_path):
+            logger.info("No quantized model found, skipping int8 evaluation")
+            return
+
+        quantized_model = load_quantized_model(self.config.quantized_model_path)
+        preds, labels, _ = self.score(quantized_model)
+        f1 = float(f1_score(labels,preds,average="weighted"))
+        f1_drop = float(self.metrics["f1_score"] - f1)
+        promoted = bool(f1_drop <= self.config.max_f1_drop)
+
+        self.metrics["int8_accuracy"] = float(accuracy_score(labels,preds))
+        self.metrics["int8_f1_score"] = f1
+        self.metrics["int8_promoted"] = promoted
+
+        # kept out of the model_trainer outputs, the registry matches model_version to the int8 build it serves
+        create_directories([self.config.root_dir])
+        save_json(path=Path(self.config.promotion_file), data={
+            "promoted": promoted,
+            "model_version": get_weights_fingerprint(Path(self.config.quantized_model_path)),
+            "fp32_f1_score": self.metrics["f1_score"],
+            "int8_f1_score": f1,
+            "f1_drop": f1_drop,
+            "max_f1_drop": self.config.max_f1_drop
+        })
+
+        if promoted:
+            logger.info(f"int8 model promoted, F1 drop {f1_drop:.4f}")
+        else:
+            logger.warning(f"int8 model not promoted, F1 drop {f1_drop:.4f} exceeds {self.config.max_f1_drop}")
+
+        self.save_metrics(self.metrics)
+
+    def layoutlmv3_latency_ms(self, image_paths: list) -> float:
+        """Mean end-to-end latency of the full path (decode, uncached OCR, encode, forward) at batch size 1."""
+        ocr = OCREngine(self.ocr_config)
+        timings = []
+        with torch.no_grad():
+            for path in image_paths:
+                started = time.perf_counter()
+                image = Image.open(path).convert("RGB")
+                words, boxes = ocr.run_ocr(image)
+                encoding = self.processor(images=image, text=words, boxes=boxes, truncation=True, return_tensors="pt")
+                self.model(**encoding)
+                timings.append((time.perf_counter() - started) * 1000)
+        return float(np.mean(timings))
+
+    def evaluate_cascade(self):
+        """Replays the test split through the visual classifier, falling back to LayoutLMv3 below its threshold."""
+        if not os.path.isdir(self.config.visual_classifier_path):
+            logger.info("No visual classifier found, skipping cascade evaluation")
+            return
+
+        gate = VisualGate.load(self.config.visual_classifier_path)
+        # encoded_data/test was mapped from raw_dataset/test, so row i is the same document in both
+        raw_test = load_from_disk(os.path.join(self.config.raw_data_path, "test"))
+        image_paths, label_names, labels = raw_test["image_path"], raw_test["label"], raw_test["labels"]
+
+        correct, short_circuited, visual_ms = [], [], []
+        for i, path in enumerate(image_paths):
+            started = time.perf_counter()
+            label, confidence = gate.predict(Image.open(path))
+            visual_ms.append((time.perf_counter() - started) * 1000)
+
+            if confidence >= gate.threshold:
+                short_circuited.append(True)
+                correct.append(label == label_names[i])
+            else:
+                short_circuited.append(False)
+                correct.append(self.preds[i] == labels[i])
+
+        # OCR dominates the full path, timing it on a sample keeps evaluation affordable
+        full_ms = self.layoutlmv3_latency_ms(image_paths[:self.config.cascade_latency_samples])
+        fallback = ~np.array(short_circuited)
+
+        self.metrics["cascade_threshold"] = float(gate.threshold)
+        self.metrics["cascade_accuracy"] = float(np.mean(correct))
+        self.metrics["cascade_short_circuit_fraction"] = float(np.mean(short_circuited))
+        self.metrics["cascade_mean_latency_ms"] = float(np.mean(np.array(visual_ms) + fallback * full_ms))
+        self.metrics["layoutlmv3_mean_latency_ms"] = full_ms
+
+        logger.info(
+            f"Cascade accuracy {self.metrics['cascade_accuracy']:.4f}, "
+            f"short-circuited {self.metrics['cascade_short_circuit_fraction']:.1%}, "
+            f"mean latency {self.metrics['cascade_mean_latency_ms']:.1f} ms vs {full_ms:.1f} ms"
+        )
+        self.save_metrics(self.metrics)
+
     def save_metrics(self,metrics):
         scores = {"f1_score": metrics["f1_score"], "accuracy": metrics["accuracy"],"mean_confidence": float(np.mean(metrics["confidence_scores_list"]))}
+        for key in ("int8_f1_score", "int8_accuracy", "int8_promoted",
+                    "cascade_threshold", "cascade_accuracy", "cascade_short_circuit_fraction",
+                    "cascade_mean_latency_ms", "layoutlmv3_mean_latency_ms"):
+            if key in metrics:
+                scores[key] = metrics[key]
         save_json(path=Path("metrics.json"), data=scores)
 
     
@@ -0,0 +1,174 @@
+import os
+import time
+import random
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from prometheus_client import Counter, Gauge, Histogram
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import ModelPoolConfig
+from src.DocumindAI.components.model_registry import ModelRegistry, LoadedModel
+from src.DocumindAI.components.model_quantization import read_promotion, QUANTIZED_WEIGHTS_FILE
+from src.DocumindAI.utils.common import get_directory_fingerprint
+
+
+POOL_BYTES = Gauge("documind_model_pool_bytes", "Estimated weight bytes held by pinned/shadow model versions")
+POOL_EVICTIONS = Counter("documind_model_pool_evictions_total", "Model versions evicted to stay within the memory budget")
+SHADOW = Counter("documind_shadow_total", "Shadow-scored requests by agreement with the primary model", ["agreement"])
+SHADOW_LATENCY = Histogram("documind_shadow_latency_seconds", "Encode and forward latency of shadow-scored requests", ["role"])
+
+
+class UnknownModelVersion(KeyError):
+    pass
+
+
+class VersionNotPromoted(Exception):
+    pass
+
+
+def directory_bytes(model_dir) -> int:
+    """On-disk size of a model directory, used as the estimate of its resident weights."""
+    return sum(f.stat().st_size for f in Path(model_dir).rglob("*") if f.is_file())
+
+
+class ModelPool:
+    """
+    Named model versions loaded on demand next to the primary one in the
+    ModelRegistry, kept within memory_budget_mb by evicting the least
+    recently used. The primary model is not counted against the budget.
+
+    Pinned requests run a pooled version on pinned_workers threads of their
+    own, without the micro-batcher, whose batches all go to the primary model. Shadow scoring re-runs a
+    sampled fraction of primary requests on shadow_version in a background
+    thread and records agreement and latency.
+    """
+    def __init__(self, registry: ModelRegistry, config: ModelPoolConfig):
+        self.registry = registry
+        self.config = config
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in config.versions}
+        self._version_ids = {}
+        self._pinned_pool = ThreadPoolExecutor(max_workers=config.pinned_workers, thread_name_prefix="documind-pinned")
+        # one shadow job at a time, samples arriving while it is busy are skipped
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="documind-shadow")
+        self._shadow_slot = threading.Semaphore(1)
+
+    def model_dir(self, name: str) -> str:
+        if name not in self.config.versions:
+            raise UnknownModelVersion(name)
+        return self.config.versions[name]
+
+    def version_id(self, name: str) -> str:
+        """Cache key component for a pinned version, fingerprinted on first use and again by refresh().
+
+        Raises VersionNotPromoted for an int8 build ModelEvaluation has not
+        promoted, pinned requests go through the same gate as the primary model.
+        """
+        with self._lock:
+            entry = self._version_ids.get(name)
+        version, promoted = entry or self._fingerprint(name)
+        if not promoted:
+            raise VersionNotPromoted(f"Model version {name!r} is an int8 build that evaluation has not promoted")
+        return version
+
+    def _fingerprint(self, name: str) -> tuple:
+        model_dir = self.model_dir(name)
+        promoted = (not os.path.exists(os.path.join(model_dir, QUANTIZED_WEIGHTS_FILE))
+                    or read_promotion(self.registry.config.promotion_file, model_dir).get("promoted", False))
+        entry = (f"{name}:{get_directory_fingerprint(Path(model_dir))}", promoted)
+        with self._lock:
+            self._version_ids[name] = entry
+        return entry
+
+    def refresh(self):
+        """Re-fingerprints the versions in use, a changed one is reloaded on its next request.
+
+        Called by the ModelWatcher on every poll, so pinned requests never walk
+        a model directory themselves.
+        """
+        with self._lock:
+            names = list(self._version_ids)
+        for name in names:
+            self._fingerprint(name)
+
+    def get(self, name: str) -> LoadedModel:
+        """The loaded version, reloaded when its directory has changed since it was loaded."""
+        model_dir = self.model_dir(name)
+        version = self.version_id(name)
+        with self._lock:
+            loaded = self._models.get(name)
+            if loaded is not None and loaded.version == version:
+                self._models.move_to_end(name)
+                return loaded
+
+        # concurrent first requests for a version load it once
+        with self._load_locks[name]:
+            with self._lock:
+                loaded = self._models.get(name)
+                if loaded is not None and loaded.version == version:
+                    return loaded
+
+            loaded = self.registry.build(model_dir, version=version)
+            self.registry.warm(loaded)
+
+            with self._lock:
+                self._models[name] = loaded
+                self._models.move_to_end(name)
+                self._sizes[name] = directory_bytes(model_dir)
+                self._evict(keep=name)
+                POOL_BYTES.set(sum(self._sizes.values()))
+            logger.info(f"Model pool loaded {version} ({self._sizes[name] / 2**20:.0f} MB)")
+            return loaded
+
+    def _evict(self, keep: str):
+        budget = self.config.memory_budget_mb * 2**20
+        while sum(self._sizes.values()) > budget and len(self._models) > 1:
+            name = next(iter(self._models))
+            if name == keep:
+                break
+            self._models.pop(name)
+            self._sizes.pop(name)
+            POOL_EVICTIONS.inc()
+            logger.info(f"Model pool evicted {name}")
+
+    def predict(self, name: str, image, words: list, boxes: list):
+        loaded = self.get(name)
+        encoding = self.registry.encode(image, words, boxes, loaded=loaded)
+        return self.registry.decode(loaded.backend(encoding)[0], loaded=loaded)
+
+    def submit(self, name: str, image, words: list, boxes: list) -> Future:
+        return self._pinned_pool.submit(self.predict, name, image, words, boxes)
+
+    def maybe_shadow(self, image, words: list, boxes: list, primary_label: str, primary_seconds: float):
+        """Schedules a shadow comparison for a sampled request, never blocking the caller."""
+        if not self.config.shadow_version or random.random() >= self.config.shadow_sample_fraction:
+            return
+        if not self._shadow_slot.acquire(blocking=False):
+            return
+        self._shadow_pool.submit(self._shadow, image, words, boxes, primary_label, primary_seconds)
+
+    def _shadow(self, image, words: list, boxes: list, primary_label: str, primary_seconds: float):
+        try:
+            started = time.perf_counter()
+            label, confidence = self.predict(self.config.shadow_version, image, words, boxes)
+            shadow_seconds = time.perf_counter() - started
+
+            agreement = "agree" if label == primary_label else "disagree"
+            SHADOW.labels(agreement=agreement).inc()
+            SHADOW_LATENCY.labels(role="primary").observe(primary_seconds)
+            SHADOW_LATENCY.labels(role="shadow").observe(shadow_seconds)
+            logger.info(
+                f"shadow {self.config.shadow_version}: {agreement} (primary {primary_label}, shadow {label} {confidence:.3f}), "
+                f"latency delta {1000 * (shadow_seconds - primary_seconds):+.1f} ms"
+            )
+        except Exception as e:
+            logger.exception(e)
+        finally:
+            self._shadow_slot.release()
+
+    def shutdown(self):
+        self._pinned_pool.shutdown(wait=False, cancel_futures=True)
+        self._shadow_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,55 @@
+import os
+import json
+import torch
+from pathlib import Path
+from transformers import AutoConfig, AutoProcessor, LayoutLMv3ForSequenceClassification
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import QuantizationConfig
+from src.DocumindAI.utils.common import get_weights_fingerprint
+
+
+QUANTIZED_WEIGHTS_FILE = "pytorch_model_int8.bin"
+
+
+def quantize(model):
+    """int8 dynamic quantization of every Linear layer, activations are quantized on the fly"""
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_quantized_model(model_dir):
+    config = AutoConfig.from_pretrained(model_dir)
+    model = quantize(LayoutLMv3ForSequenceClassification(config))
+    model.load_state_dict(torch.load(os.path.join(model_dir, QUANTIZED_WEIGHTS_FILE), map_location="cpu"))
+    model.eval()
+    return model
+
+
+def read_promotion(path, model_dir) -> dict:
+    """ModelEvaluation's verdict on the int8 model, only if it was made for the build now in model_dir"""
+    if not os.path.exists(path):
+        return {"promoted": False}
+    with open(path, "r") as f:
+        promotion = json.load(f)
+    # a build quantized after the last evaluation is never served on an older verdict
+    if promotion.get("model_version") != get_weights_fingerprint(Path(model_dir)):
+        return {"promoted": False}
+    return promotion
+
+
+class ModelQuantization:
+    def __init__(self, config: QuantizationConfig):
+        self.config = config
+
+    def quantize_model(self):
+        print(f"Quantizing {self.config.model_path} to int8")
+        model = LayoutLMv3ForSequenceClassification.from_pretrained(self.config.model_path)
+        model.eval()
+        quantized = quantize(model)
+
+        os.makedirs(self.config.quantized_model_path, exist_ok=True)
+        torch.save(quantized.state_dict(), os.path.join(self.config.quantized_model_path, QUANTIZED_WEIGHTS_FILE))
+        model.config.save_pretrained(self.config.quantized_model_path)
+        AutoProcessor.from_pretrained(self.config.model_path).save_pretrained(self.config.quantized_model_path)
+
+        logger.info(f"Quantized model saved at: {self.config.quantized_model_path}")
+        print("✅ Quantized model saved successfully!")
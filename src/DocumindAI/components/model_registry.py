@@ -0,0 +1,166 @@
+import os
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+import torch
+from transformers import AutoProcessor, LayoutLMv3ForSequenceClassification
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import ServingConfig
+from src.DocumindAI.utils.common import get_directory_fingerprint
+from src.DocumindAI.components.model_quantization import load_quantized_model, read_promotion, QUANTIZED_WEIGHTS_FILE
+from src.DocumindAI.components.inference_backend import TorchBackend, OnnxBackend
+from src.DocumindAI.components.onnx_export import ONNX_MODEL_FILE
+from src.DocumindAI.utils.mmap_weights import load_mmap_model, SAFETENSORS_FILE
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    processor: object
+    backend: object
+    id2label: dict
+    version: str
+
+
+class ModelRegistry:
+    """
+    Holds one processor/model/label map per process so requests share a
+    single warm instance instead of reloading LayoutLMv3 on every call.
+    """
+    def __init__(self, config: ServingConfig):
+        self.config = config
+        self._loaded = None
+        self._load_lock = threading.Lock()
+        # fast tokenizers are not safe to call from several threads at once
+        self._processor_lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def use_quantized(self) -> bool:
+        if self.config.precision != "int8":
+            return False
+        if not read_promotion(self.config.promotion_file, self.config.quantized_model_path).get("promoted", False):
+            logger.warning("int8 model requested but not promoted by evaluation, serving fp32")
+            return False
+        return True
+
+    def model_dir(self) -> str:
+        if self.config.backend == "onnx":
+            return self.config.onnx_model_path
+        if self.config.variant == "student":
+            return self.config.student_model_path
+        return self.config.quantized_model_path if self.use_quantized() else self.config.model_path
+
+    def load_backend(self, model_dir: str):
+        # decided by what the directory holds, so the model pool can load any exported version
+        if os.path.exists(os.path.join(model_dir, ONNX_MODEL_FILE)):
+            return OnnxBackend(os.path.join(model_dir, ONNX_MODEL_FILE), self.config.onnx_threads)
+
+        if os.path.exists(os.path.join(model_dir, QUANTIZED_WEIGHTS_FILE)):
+            model = load_quantized_model(model_dir)
+        elif self.config.mmap_weights and os.path.exists(os.path.join(model_dir, SAFETENSORS_FILE)):
+            model = load_mmap_model(model_dir)
+        else:
+            model = LayoutLMv3ForSequenceClassification.from_pretrained(model_dir)
+        model.eval()
+        return TorchBackend(model)
+
+    def build(self, model_dir: str, version: str = None, processor_dir: str = None) -> LoadedModel:
+        """Loads a model directory into a new LoadedModel without touching the one being served."""
+        logger.info(f"Loading model from {model_dir}")
+        processor = AutoProcessor.from_pretrained(processor_dir or model_dir, apply_ocr=False)
+        backend = self.load_backend(model_dir)
+
+        with open(self.config.id2label_path, "r") as f:
+            id2label = {int(k): v for k, v in json.load(f).items()}
+
+        version = version or get_directory_fingerprint(Path(model_dir))
+        return LoadedModel(processor=processor, backend=backend, id2label=id2label, version=version)
+
+    def load(self) -> LoadedModel:
+        with self._load_lock:
+            if self._loaded is None:
+                if self.config.torch_threads:
+                    torch.set_num_threads(self.config.torch_threads)
+                self._loaded = self.build(self.model_dir())
+                logger.info(f"Model version {self._loaded.version} loaded successfully")
+        return self._loaded
+
+    def reload(self, model_dir: str = None, version: str = None, processor_dir: str = None) -> LoadedModel:
+        """Loads and warms a new version next to the current one, then swaps it in.
+
+        Each forward pass reads the served model once, so batches already
+        running finish on the old version and it is freed once they release it.
+        """
+        candidate = self.build(model_dir or self.model_dir(), version, processor_dir)
+        self.warm(candidate)
+        with self._load_lock:
+            previous, self._loaded = self._loaded, candidate
+        logger.info(f"Swapped model {previous.version if previous else None} -> {candidate.version}")
+        return candidate
+
+    def get(self) -> LoadedModel:
+        if self._loaded is None:
+            return self.load()
+        return self._loaded
+
+    @property
+    def model_version(self) -> str:
+        # cheap to compute before loading, so cache keys never wait on the model
+        if self._loaded is None:
+            return get_directory_fingerprint(Path(self.model_dir()))
+        return self._loaded.version
+
+    def warm(self, loaded: LoadedModel):
+        """Runs warmup_iterations dummy passes through a LoadedModel before it serves traffic."""
+        inputs = self.dummy_inputs(loaded)
+        for _ in range(self.config.warmup_iterations):
+            loaded.backend(inputs)
+
+    def warmup(self):
+        self.warm(self.get())
+        self._ready.set()
+        logger.info(f"Model warm-up completed ({self.config.warmup_iterations} passes)")
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def dummy_inputs(self, loaded: LoadedModel) -> dict:
+        seq_len = self.config.max_length
+        size = loaded.processor.image_processor.size
+        pad_id = loaded.processor.tokenizer.pad_token_id
+
+        return {
+            "input_ids": torch.full((1, seq_len), pad_id, dtype=torch.long),
+            "bbox": torch.zeros((1, seq_len, 4), dtype=torch.long),
+            "attention_mask": torch.ones((1, seq_len), dtype=torch.long),
+            "pixel_values": torch.zeros((1, 3, size["height"], size["width"])),
+        }
+
+    def encode(self, image, words: list, boxes: list, loaded: LoadedModel = None) -> dict:
+        """Encodes one page without padding, the batcher pads to the longest sequence in its batch."""
+        loaded = loaded or self.get()
+        with self._processor_lock:
+            encoding = loaded.processor(
+                images=image,
+                text=words,
+                boxes=boxes,
+                truncation=True,
+                max_length=self.config.max_length,
+                return_tensors="pt"
+            )
+        return {k: v for k, v in encoding.items()}
+
+    def forward(self, inputs: dict) -> torch.Tensor:
+        return self.get().backend(inputs)
+
+    def decode(self, logits: torch.Tensor, loaded: LoadedModel = None):
+        loaded = loaded or self.get()
+        probs = torch.softmax(logits, dim=-1)
+
+        predicted_id = int(probs.argmax(dim=-1).item())
+        confidence = float(probs.max().item())
+
+        return loaded.id2label[predicted_id], confidence
+
+    def predict(self, image, words: list, boxes: list):
+        return self.decode(self.forward(self.encode(image, words, boxes)))
@@ -1,31 +1,80 @@
 import os
+import json
+import math
 import torch
 from datasets import load_from_disk
 from transformers import LayoutLMv3ForSequenceClassification
 from transformers import TrainingArguments, Trainer, AutoProcessor
 from src.DocumindAI.entity.config_entity import ModelTrainerConfig
+from src.DocumindAI.components.data_preprocessing import MANIFEST_FILE
+from src.DocumindAI.utils.compact_encoding import CompactCollator
+from src.DocumindAI.utils.mmap_dataset import MappedSplit, mapped_loader
+
+
+class MappedTrainer(Trainer):
+    """Trainer whose MappedSplit datasets are served by mapped_loader, batches built and prefetched by workers."""
+    def get_train_dataloader(self):
+        if not isinstance(self.train_dataset, MappedSplit):
+            return super().get_train_dataloader()
+        return mapped_loader(
+            self.train_dataset,
+            batch_size=self.args.per_device_train_batch_size,
+            shuffle=True,
+            num_workers=self.args.dataloader_num_workers,
+            prefetch_factor=self.args.dataloader_prefetch_factor,
+            seed=self.args.seed
+        )
+
+    def get_eval_dataloader(self, eval_dataset=None):
+        dataset = eval_dataset if eval_dataset is not None else self.eval_dataset
+        if not isinstance(dataset, MappedSplit):
+            return super().get_eval_dataloader(eval_dataset)
+        return mapped_loader(
+            dataset,
+            batch_size=self.args.eval_batch_size,
+            num_workers=self.args.dataloader_num_workers,
+            prefetch_factor=self.args.dataloader_prefetch_factor
+        )
+
 
 class ModelTrainer:
     def __init__(self, config:ModelTrainerConfig):
         self.config = config
         self.model = None   
-        self.preprocessor = AutoProcessor.from_pretrained(self.config.model,apply_ocr=True)   
+        self.preprocessor = AutoProcessor.from_pretrained(self.config.model,apply_ocr=False)   
 
     def load_encoded_dataset(self):
         print("Loading encoded dataset from disk")
         base_path = self.config.data_path
 
+        collator = CompactCollator(self.preprocessor)
+
+        # batches come straight from the memory-mapped Arrow files, see utils/mmap_dataset.py
         self.encoded_dataset = {
-            'train': load_from_disk(os.path.join(base_path, "train")),
-            'val': load_from_disk(os.path.join(base_path, "val")),
-            'test': load_from_disk(os.path.join(base_path, "test"))
+            split_name: MappedSplit(os.path.join(base_path, split_name), collator)
+            for split_name in ('train', 'val', 'test')
         }
 
-        for split_name in self.encoded_dataset:
-            self.encoded_dataset[split_name].set_format(type='torch')
+        with open(os.path.join(base_path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+
+        if self.config.streaming:
+            # read shard by shard in a shuffled order through a shuffle buffer, memory stays flat
+            # however large the split; Trainer reshuffles it every epoch through set_epoch
+            # compact rows stay uint8/int16/int32 and unpadded until CompactCollator expands a batch
+            train = load_from_disk(os.path.join(base_path, "train"))
+            self.encoded_dataset['train'] = train.to_iterable_dataset(
+                num_shards=self.manifest['train']['num_shards']
+            ).shuffle(seed=42, buffer_size=self.config.shuffle_buffer_size).with_format('numpy')
 
         print("✅ Encoded dataset successfully loaded and formatted!")
 
+    def max_steps(self) -> int:
+        """Optimizer steps for num_train_epochs, an iterable dataset has no length for Trainer to derive it from."""
+        rows_per_step = self.config.per_device_train_batch_size * self.config.gradient_accumulation_steps
+        steps_per_epoch = max(1, math.ceil(self.manifest['train']['num_rows'] / rows_per_step))
+        return steps_per_epoch * self.config.num_train_epochs
+
     def initialize_model(self):
         print("Initializing LayoutLMv3 model")
 
@@ -64,13 +113,19 @@ class ModelTrainer:
             load_best_model_at_end=self.config.load_best_model_at_end,
             remove_unused_columns=self.config.remove_unused_columns,
             optim = self.config.optim,
+            max_steps = self.max_steps() if self.config.streaming else -1,
+            dataloader_num_workers = self.config.dataloader_num_workers,
+            dataloader_prefetch_factor = self.config.dataloader_prefetch_factor if self.config.dataloader_num_workers else None,
+            # serving memory-maps model.safetensors, see utils/mmap_weights.py
+            save_safetensors=True,
             report_to=None
         )
-        self.trainer = Trainer(
+        self.trainer = MappedTrainer(
             model=self.model,
             args=self.training_args,
             train_dataset=self.encoded_dataset["train"],
             eval_dataset=self.encoded_dataset["val"],
+            data_collator=CompactCollator(self.preprocessor),
         )
         print("Trainer ready!")
 
@@ -0,0 +1,121 @@
+import os
+import threading
+from pathlib import Path
+from prometheus_client import Counter
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import HotReloadConfig
+from src.DocumindAI.components.model_registry import ModelRegistry
+from src.DocumindAI.components.model_pool import ModelPool
+from src.DocumindAI.utils.common import get_directory_fingerprint
+
+
+RELOADS = Counter("documind_model_reloads_total", "Background model reloads", ["result"])
+
+
+class ModelWatcher:
+    """
+    Polls for a new model version and hot-swaps it into the registry.
+
+    source "local" watches the fingerprint of the served model directory and
+    reloads once it has been stable for two polls, so a half-written
+    directory is never loaded. source "mlflow" watches the registered model
+    alias ("champion" by default) and downloads each new version before
+    loading it, the version the alias names at start is taken to be the one
+    already served. Each poll also re-fingerprints the ModelPool versions in use.
+    """
+    def __init__(self, registry: ModelRegistry, config: HotReloadConfig, pool: ModelPool = None):
+        self.registry = registry
+        self.config = config
+        self.pool = pool
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending_fingerprint = None
+        self._mlflow_version = None
+
+    def start(self):
+        if self._thread is None:
+            if self.config.source == "mlflow":
+                self._mlflow_version = self.served_mlflow_version()
+            self._thread = threading.Thread(target=self._run, name="documind-model-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Watching {self.config.source} for new model versions every {self.config.poll_interval_seconds}s")
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.config.poll_interval_seconds):
+            try:
+                if self.pool is not None:
+                    self.pool.refresh()
+                if self.config.source == "mlflow":
+                    self.check_mlflow()
+                else:
+                    self.check_local()
+            except Exception as e:
+                # keep serving the current version, the next poll tries again
+                RELOADS.labels(result="failure").inc()
+                logger.exception(e)
+
+    def check_local(self):
+        fingerprint = get_directory_fingerprint(Path(self.registry.model_dir()))
+        if fingerprint == self.registry.model_version:
+            self._pending_fingerprint = None
+            return
+        if fingerprint != self._pending_fingerprint:
+            # changed since the last poll, maybe still being written
+            self._pending_fingerprint = fingerprint
+            return
+
+        self.registry.reload()
+        self._pending_fingerprint = None
+        RELOADS.labels(result="success").inc()
+
+    def alias_version(self):
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
+        mlflow.set_tracking_uri(self.config.mlflow_uri)
+        return MlflowClient().get_model_version_by_alias(self.config.registered_model_name, self.config.alias)
+
+    def served_mlflow_version(self):
+        """The registered version the model loaded at startup corresponds to, None if it can't be told.
+
+        ModelEvaluation registers the model it has just evaluated, the one in
+        model_path, and points the alias at it, so a worker starting on that
+        model is already serving the alias version and must not download it again.
+        """
+        if self.registry.model_version.startswith("mlflow-"):
+            return self.registry.model_version[len("mlflow-"):]
+        try:
+            version = self.alias_version().version
+        except Exception as e:
+            logger.warning(f"Could not resolve {self.config.registered_model_name}@{self.config.alias}, the first poll reloads it: {e}")
+            return None
+        logger.info(f"Serving {self.config.registered_model_name} v{version} ({self.config.alias}) from {self.registry.model_dir()}")
+        return version
+
+    def check_mlflow(self):
+        import mlflow
+
+        model_version = self.alias_version()
+        if model_version.version == self._mlflow_version:
+            return
+
+        dst_path = os.path.join(self.config.download_dir, f"{self.config.registered_model_name}-v{model_version.version}")
+        if not os.path.isdir(dst_path):
+            logger.info(f"Downloading {self.config.registered_model_name} v{model_version.version} ({self.config.alias})")
+            mlflow.artifacts.download_artifacts(
+                artifact_uri=f"models:/{self.config.registered_model_name}/{model_version.version}",
+                dst_path=dst_path
+            )
+
+        # the transformers flavor keeps the Hugging Face files under model/, the processor is not logged
+        self.registry.reload(
+            model_dir=os.path.join(dst_path, "model"),
+            version=f"mlflow-{model_version.version}",
+            processor_dir=self.registry.config.model_path
+        )
+        self._mlflow_version = model_version.version
+        RELOADS.labels(result="success").inc()
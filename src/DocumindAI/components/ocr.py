@@ -0,0 +1,106 @@
+import os
+import io
+import json
+import hashlib
+import tempfile
+import numpy as np
+from PIL import Image
+from prometheus_client import Counter
+from transformers.models.layoutlmv3.image_processing_layoutlmv3 import apply_tesseract
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import OCRConfig
+
+
+HITS = Counter("documind_ocr_cache_hits_total", "OCR results served from the on-disk store")
+MISSES = Counter("documind_ocr_cache_misses_total", "OCR results computed with tesseract")
+
+
+class OCREngine:
+    """
+    Runs tesseract explicitly and keeps the words and normalized boxes in a
+    content-addressed on-disk store keyed on the image bytes and the OCR
+    settings, so the processor can be used with `apply_ocr=False`.
+    """
+    def __init__(self, config: OCRConfig):
+        self.config = config
+        os.makedirs(self.config.cache_dir, exist_ok=True)
+
+        self._settings = json.dumps({
+            "lang": self.config.lang,
+            "tesseract_config": self.config.tesseract_config,
+            "tesseract_version": self.tesseract_version(),
+        }, sort_keys=True)
+
+    @property
+    def settings(self) -> str:
+        """The OCR settings every store key is derived from."""
+        return self._settings
+
+    @staticmethod
+    def tesseract_version() -> str:
+        try:
+            import pytesseract
+            return str(pytesseract.get_tesseract_version())
+        except Exception as e:
+            logger.warning(f"Could not determine tesseract version: {e}")
+            return "unknown"
+
+    def key(self, data: bytes) -> str:
+        digest = hashlib.sha256(self._settings.encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.config.cache_dir, key[:2], f"{key}.json")
+
+    def lookup(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            content = json.load(f)
+        return content["words"], content["boxes"]
+
+    def store(self, key: str, words: list, boxes: list):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write then rename so concurrent readers never see a partial file, a unique
+        # temp file per call keeps threads of the same process from sharing one
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            json.dump({"words": words, "boxes": boxes}, f)
+        os.replace(f.name, path)
+
+    def run_ocr(self, image: Image.Image):
+        words, boxes = apply_tesseract(np.array(image), self.config.lang, self.config.tesseract_config)
+        return list(words), [list(map(int, box)) for box in boxes]
+
+    def get_cached(self, data: bytes):
+        cached = self.lookup(self.key(data))
+        if cached is not None:
+            HITS.inc()
+        return cached
+
+    def compute(self, data: bytes, image: Image.Image = None):
+        """Runs tesseract on the image and stores the result, skipping the cache lookup.
+
+        Not counted as a miss here, it also runs in OCR worker processes whose
+        counters are never scraped; callers count it in the serving process.
+        """
+        if image is None:
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+        words, boxes = self.run_ocr(image)
+        self.store(self.key(data), words, boxes)
+        return words, boxes
+
+    def ocr_bytes(self, data: bytes, image: Image.Image = None):
+        cached = self.get_cached(data)
+        if cached is not None:
+            return cached
+        MISSES.inc()
+        return self.compute(data, image)
+
+    def ocr_file(self, path, image: Image.Image = None):
+        with open(path, "rb") as f:
+            data = f.read()
+        return self.ocr_bytes(data, image)
@@ -0,0 +1,96 @@
+import os
+import json
+import torch
+from transformers import AutoProcessor, LayoutLMv3ForSequenceClassification
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import OnnxExportConfig
+from src.DocumindAI.components.inference_backend import OnnxBackend
+
+
+ONNX_MODEL_FILE = "model.onnx"
+INPUT_NAMES = ["input_ids", "bbox", "attention_mask", "pixel_values"]
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Fixes the positional signature and drops everything but logits for export."""
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, bbox, attention_mask, pixel_values):
+        return self.model(
+            input_ids=input_ids, bbox=bbox, attention_mask=attention_mask, pixel_values=pixel_values
+        ).logits
+
+
+class OnnxExport:
+    def __init__(self, config: OnnxExportConfig):
+        self.config = config
+        self.onnx_path = os.path.join(self.config.root_dir, ONNX_MODEL_FILE)
+
+    def dummy_inputs(self, model, batch_size: int, seq_len: int) -> dict:
+        size = model.config.input_size
+        boxes = torch.randint(0, 500, (batch_size, seq_len, 4))
+        # keep x0 <= x1 and y0 <= y1 like real OCR boxes
+        boxes[..., 2:] += boxes[..., :2]
+        return {
+            "input_ids": torch.randint(3, model.config.vocab_size, (batch_size, seq_len)),
+            "bbox": boxes,
+            "attention_mask": torch.ones((batch_size, seq_len), dtype=torch.long),
+            "pixel_values": torch.randn((batch_size, 3, size, size)),
+        }
+
+    def export(self):
+        print(f"Exporting {self.config.model_path} to ONNX")
+        model = LayoutLMv3ForSequenceClassification.from_pretrained(self.config.model_path)
+        model.eval()
+
+        inputs = self.dummy_inputs(model, batch_size=2, seq_len=16)
+        sequence_axes = {0: "batch", 1: "sequence"}
+
+        os.makedirs(self.config.root_dir, exist_ok=True)
+        torch.onnx.export(
+            _LogitsOnly(model),
+            tuple(inputs[name] for name in INPUT_NAMES),
+            self.onnx_path,
+            input_names=INPUT_NAMES,
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": sequence_axes,
+                "bbox": sequence_axes,
+                "attention_mask": sequence_axes,
+                "pixel_values": {0: "batch"},
+                "logits": {0: "batch"},
+            },
+            opset_version=self.config.opset_version,
+            do_constant_folding=True,
+        )
+
+        # serving loads processor and config from the same directory as the graph
+        model.config.save_pretrained(self.config.root_dir)
+        AutoProcessor.from_pretrained(self.config.model_path).save_pretrained(self.config.root_dir)
+
+        logger.info(f"ONNX model saved at: {self.onnx_path}")
+        print("✅ ONNX export completed!")
+        return model
+
+    def validate(self, model):
+        """Compares ONNX Runtime and PyTorch logits on several batch and sequence shapes."""
+        backend = OnnxBackend(self.onnx_path)
+        max_diff = 0.0
+
+        for batch_size, seq_len in [(1, 8), (3, 64), (4, 512)]:
+            inputs = self.dummy_inputs(model, batch_size, seq_len)
+            with torch.inference_mode():
+                expected = model(**inputs).logits
+            actual = backend(inputs)
+            max_diff = max(max_diff, float((expected - actual).abs().max()))
+
+        passed = max_diff <= self.config.atol
+        with open(os.path.join(self.config.root_dir, "parity.json"), "w") as f:
+            json.dump({"max_abs_diff": max_diff, "atol": self.config.atol, "passed": passed}, f, indent=4)
+
+        if not passed:
+            raise ValueError(f"ONNX logits differ from PyTorch by {max_diff:.2e} (atol {self.config.atol})")
+
+        print(f"✅ ONNX parity check passed (max abs diff {max_diff:.2e})")
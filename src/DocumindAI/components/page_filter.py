@@ -0,0 +1,72 @@
+import numpy as np
+from PIL import Image
+from prometheus_client import Counter
+from src.DocumindAI.entity.config_entity import PageFilterConfig
+
+
+BLANK_PAGE = "blank_page"
+NON_DOCUMENT = "non_document"
+
+# rejection rate = sum(rate(result!="accepted")) / sum(rate(total))
+PAGES = Counter("documind_page_filter_total", "Pages seen by the pre-OCR page filter", ["result"])
+
+
+class PageFilter:
+    """
+    Rejects blank separator sheets and non-document photos from pixel
+    statistics on a small grayscale copy, before they reach OCR and the model.
+    """
+    def __init__(self, config: PageFilterConfig):
+        self.config = config
+
+    def statistics(self, image: Image.Image) -> dict:
+        # nearest-neighbour sampling keeps real pixel values, averaging would wash thin strokes out to grey
+        scale = self.config.thumbnail_size / max(image.size)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        thumbnail = image.resize(size, Image.NEAREST).convert("RGB")
+
+        rgb = np.asarray(thumbnail, dtype=np.int16)
+        gray = np.asarray(thumbnail.convert("L"), dtype=np.float32)
+
+        return {
+            "ink_density": float((gray < self.config.ink_level).mean()),
+            "std": float(gray.std()),
+            "paper_fraction": float((gray > self.config.paper_level).mean()),
+            "saturation": float((rgb.max(axis=2) - rgb.min(axis=2)).mean()),
+            "aspect": image.width / image.height,
+        }
+
+    def check(self, image: Image.Image):
+        """Returns BLANK_PAGE or NON_DOCUMENT for a page that should skip OCR, otherwise None."""
+        if not self.config.enabled:
+            return None
+
+        stats = self.statistics(image)
+        if stats["ink_density"] < self.config.min_ink_density or stats["std"] < self.config.min_std:
+            result = BLANK_PAGE
+        elif (not self.config.min_aspect <= stats["aspect"] <= self.config.max_aspect
+              or stats["paper_fraction"] < self.config.min_paper_fraction
+              or stats["saturation"] > self.config.max_saturation):
+            result = NON_DOCUMENT
+        else:
+            result = None
+
+        PAGES.labels(result=result or "accepted").inc()
+        return result
+
+
+def screen(page_filter: PageFilter, visual_gate, image: Image.Image):
+    """Answer for a page that needs no OCR, shared by the serving and bulk paths.
+
+    Returns {"label", "confidence"} when the page filter rejects the page or
+    the cascade's visual gate (None when the cascade is off) is confident
+    about it, otherwise None.
+    """
+    rejection = page_filter.check(image)
+    if rejection is not None:
+        return {"label": rejection, "confidence": 1.0}
+    if visual_gate is not None:
+        answer = visual_gate.classify(image)
+        if answer is not None:
+            return {"label": answer[0], "confidence": answer[1]}
+    return None
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from prometheus_client import Counter, Gauge
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import PredictionCacheConfig
+
+
+HITS = Counter("documind_prediction_cache_hits_total", "Prediction cache hits", ["tier"])
+MISSES = Counter("documind_prediction_cache_misses_total", "Prediction cache misses")
+EVICTIONS = Counter("documind_prediction_cache_evictions_total", "Entries evicted from the in-memory tier")
+COALESCED = Counter("documind_prediction_cache_coalesced_total", "Requests that waited on an identical in-flight prediction")
+ENTRIES = Gauge("documind_prediction_cache_entries", "Entries held in the in-memory tier")
+
+
+class PredictionCache:
+    """
+    Two-tier cache of prediction results keyed on the SHA-256 of the uploaded
+    bytes plus the model version and the serving settings. Concurrent misses
+    for the same key are coalesced so only one of them runs OCR and the
+    forward pass.
+    """
+    def __init__(self, config: PredictionCacheConfig):
+        self.config = config
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._disk = None
+
+        if config.disk_enabled:
+            import diskcache
+            self._disk = diskcache.Cache(
+                str(config.disk_dir),
+                size_limit=config.disk_size_limit_mb * 1024 * 1024
+            )
+            logger.info(f"Prediction cache disk tier at {config.disk_dir}")
+
+    @staticmethod
+    def make_key(digest: str, model_version: str, settings: str) -> str:
+        # settings fingerprints what else decides the answer (page filter, cascade), the disk tier outlives config changes
+        return f"{model_version}:{settings}:{digest}"
+
+    def get(self, key: str):
+        value = self._get_memory(key)
+        if value is None and self._disk is not None:
+            value = self._get_disk(key)
+        if value is None:
+            MISSES.inc()
+        return value
+
+    def put(self, key: str, value):
+        self._put_memory(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value)
+
+    def _get_memory(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                HITS.labels(tier="memory").inc()
+                return self._memory[key]
+        return None
+
+    def _get_disk(self, key: str):
+        value = self._disk.get(key)
+        if value is not None:
+            HITS.labels(tier="disk").inc()
+            self._put_memory(key, value)
+        return value
+
+    def _put_memory(self, key: str, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.config.max_entries:
+                self._memory.popitem(last=False)
+                EVICTIONS.inc()
+            ENTRIES.set(len(self._memory))
+
+    async def get_or_compute(self, key: str, compute):
+        """Returns the cached value for `key` or awaits `compute()` once for all concurrent callers."""
+        loop = asyncio.get_running_loop()
+        value = self._get_memory(key)
+        if value is None and self._disk is not None:
+            # diskcache blocks on SQLite and file reads, keep it off the event loop
+            value = await loop.run_in_executor(None, self._get_disk, key)
+        if value is not None:
+            return value
+        MISSES.inc()
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            COALESCED.inc()
+            # a follower that times out or disconnects must not cancel the leader's future
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            value = await compute()
+            self._put_memory(key, value)
+            if not future.done():
+                future.set_result(value)
+            if self._disk is not None:
+                await loop.run_in_executor(None, self._disk.set, key, value)
+            return value
+        except asyncio.CancelledError:
+            if not future.done():
+                future.set_exception(RuntimeError("Coalesced prediction was cancelled"))
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
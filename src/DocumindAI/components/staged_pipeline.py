@@ -0,0 +1,233 @@
+import io
+import os
+import time
+import asyncio
+import hashlib
+import itertools
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from PIL import Image
+from prometheus_client import Gauge, Histogram
+from src.DocumindAI.entity.config_entity import StagedPipelineConfig, OCRConfig, DocumentConfig
+from src.DocumindAI.components.model_registry import ModelRegistry
+from src.DocumindAI.components.batching_engine import MicroBatcher
+from src.DocumindAI.components.inference_executor import InferenceExecutor
+from src.DocumindAI.components.ocr import OCREngine, MISSES as OCR_MISSES
+from src.DocumindAI.components.page_filter import PageFilter, screen
+from src.DocumindAI.components.visual_classifier import VisualGate
+from src.DocumindAI.components.model_pool import ModelPool
+from src.DocumindAI.components.document_pages import is_multipage, iter_pages, aggregate
+
+
+STAGE_QUEUE_DEPTH = Gauge("documind_stage_queue_depth", "Jobs waiting to enter a serving stage", ["stage"])
+STAGE_WAIT = Histogram("documind_stage_wait_seconds", "Time spent queued in front of a serving stage", ["stage"])
+STAGE_LATENCY = Histogram("documind_stage_latency_seconds", "Time spent inside a serving stage", ["stage"])
+
+_worker_ocr = None
+
+
+def _init_ocr_worker(config: OCRConfig):
+    global _worker_ocr
+    # one tesseract thread per process, the pool itself provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _worker_ocr = OCREngine(config)
+
+
+def _run_ocr_worker(data: bytes, image: Image.Image = None):
+    return _worker_ocr.compute(data, image)
+
+
+class Stage:
+    """A bounded queue in front of one serving stage, reporting depth, wait and latency."""
+    def __init__(self, name: str, capacity: int = None):
+        self.name = name
+        self._slots = asyncio.Semaphore(capacity) if capacity else None
+
+    async def run(self, submit, *args):
+        enqueued = time.perf_counter()
+        STAGE_QUEUE_DEPTH.labels(stage=self.name).inc()
+        try:
+            if self._slots is not None:
+                await self._slots.acquire()
+        finally:
+            STAGE_QUEUE_DEPTH.labels(stage=self.name).dec()
+
+        started = time.perf_counter()
+        STAGE_WAIT.labels(stage=self.name).observe(started - enqueued)
+        try:
+            return await asyncio.wrap_future(submit(*args))
+        finally:
+            STAGE_LATENCY.labels(stage=self.name).observe(time.perf_counter() - started)
+            if self._slots is not None:
+                self._slots.release()
+
+
+class StagedPipeline:
+    """
+    Serves a prediction as decode -> OCR -> tokenize -> forward, each stage on
+    its own pool with a bounded queue in between, so OCR for one request
+    overlaps the forward pass of another.
+
+    decode runs on the admission-controlled InferenceExecutor, OCR on a
+    process pool sized to the cores, tokenization on a small thread pool and
+    the forward pass on the MicroBatcher thread. Pages the PageFilter rejects,
+    and in cascade mode pages the VisualGate is confident about, are answered
+    during decode and never reach OCR.
+
+    PDFs and TIFFs go through classify_document, which pulls pages a chunk at
+    a time so only that chunk is decoded and its forward passes share batches.
+
+    A request pinned to a ModelPool version runs its forward pass on that
+    version instead of the batcher; unpinned ones may be shadow-scored.
+    """
+    def __init__(self, registry: ModelRegistry, engine: MicroBatcher, ocr: OCREngine,
+                 executor: InferenceExecutor, page_filter: PageFilter, config: StagedPipelineConfig,
+                 document_config: DocumentConfig, visual_gate: VisualGate = None, pool: ModelPool = None):
+        self.registry = registry
+        self.engine = engine
+        self.ocr = ocr
+        self.executor = executor
+        self.page_filter = page_filter
+        self.visual_gate = visual_gate
+        self.pool = pool
+        self.config = config
+        self.document_config = document_config
+
+        # spawn, forking after torch has started its thread pools can deadlock
+        self._ocr_pool = ProcessPoolExecutor(
+            max_workers=config.ocr_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_ocr_worker,
+            initargs=(ocr.config,)
+        )
+        self._tokenize_pool = ThreadPoolExecutor(
+            max_workers=config.tokenize_workers, thread_name_prefix="documind-tokenize"
+        )
+
+        # decode is bounded by the executor itself, which fails fast when saturated
+        self.stages = {
+            "decode": Stage("decode"),
+            "ocr": Stage("ocr", config.stage_capacity),
+            "tokenize": Stage("tokenize", config.stage_capacity),
+            "forward": Stage("forward", config.stage_capacity),
+        }
+
+    @property
+    def settings_fingerprint(self) -> str:
+        """Short hash of the serving settings a cached prediction depends on besides the model version."""
+        # a gate that is off or was never trained answers nothing, either way LayoutLMv3 sees every page
+        cascade = self.visual_gate.version if self.visual_gate is not None else "cascade-off"
+        settings = (self.page_filter.config, self.document_config, cascade)
+        return hashlib.sha256(repr(settings).encode()).hexdigest()[:12]
+
+    def _decode(self, source):
+        data = source if isinstance(source, bytes) else Path(source).read_bytes()
+        image = Image.open(io.BytesIO(data)).convert("RGB")
+        answer = screen(self.page_filter, self.visual_gate, image)
+        if answer is not None:
+            return data, image, None, answer
+        return data, image, self.ocr.get_cached(data), None
+
+    def _decode_pages(self, pages, digest: str, limit: int):
+        """Pulls up to limit pages, keyed for the OCR store by document digest and page number."""
+        decoded = []
+        for page in itertools.islice(pages, limit):
+            key = f"{digest}:{page.number}".encode()
+            answer = screen(self.page_filter, self.visual_gate, page.image)
+            if answer is not None:
+                cached = None
+            elif page.words is not None:
+                cached = page.words, page.boxes
+            else:
+                cached = self.ocr.get_cached(key)
+            decoded.append((page, key, cached, answer))
+        return decoded
+
+    async def _classify_image(self, key: bytes, image: Image.Image, cached, send_image: bool = False,
+                              version: str = None) -> dict:
+        if cached is None:
+            # single images are re-decoded from their bytes in the worker, pages have no bytes of their own
+            args = (key, image) if send_image else (key,)
+            words, boxes = await self.stages["ocr"].run(self._ocr_pool.submit, _run_ocr_worker, *args)
+            # counted here, the worker process's own counters are never exported
+            OCR_MISSES.inc()
+        else:
+            words, boxes = cached
+
+        if version is not None:
+            # the pinned version tokenizes with its own processor
+            predicted_label, confidence = await self.stages["forward"].run(
+                self.pool.submit, version, image, words, boxes
+            )
+            return {"label": predicted_label, "confidence": confidence}
+
+        started = time.perf_counter()
+        encoding = await self.stages["tokenize"].run(
+            self._tokenize_pool.submit, self.registry.encode, image, words, boxes
+        )
+        logits = await self.stages["forward"].run(self.engine.submit, encoding)
+
+        predicted_label, confidence = self.registry.decode(logits)
+        if self.pool is not None:
+            self.pool.maybe_shadow(image, words, boxes, predicted_label, time.perf_counter() - started)
+        return {"label": predicted_label, "confidence": confidence}
+
+    async def classify(self, source, version: str = None) -> dict:
+        """Classifies raw image bytes or an image path, PDF and TIFF bytes are classified page by page.
+
+        version pins the request to a ModelPool version, None serves the primary model.
+        """
+        if isinstance(source, bytes) and is_multipage(source):
+            return await self.classify_document(source, version)
+
+        data, image, cached, answer = await self.stages["decode"].run(self.executor.submit, self._decode, source)
+        if answer is not None:
+            return answer
+        return await self._classify_image(data, image, cached, version=version)
+
+    async def classify_document(self, data: bytes, version: str = None) -> dict:
+        """Per-page results and the aggregated document label of a PDF or TIFF."""
+        digest = hashlib.sha256(data).hexdigest()
+        pages = iter_pages(data, self.document_config.pdf_dpi)
+        max_pages = self.document_config.max_pages
+        results, truncated = [], False
+
+        async def classify_page(page, key, cached, answer):
+            result = answer or await self._classify_image(key, page.image, cached, send_image=True, version=version)
+            return {"page": page.number, **result}
+
+        decoding = None
+
+        def decode(fn, *args):
+            nonlocal decoding
+            decoding = self.executor.submit(fn, *args)
+            return decoding
+
+        try:
+            while True:
+                if len(results) == max_pages:
+                    # only pay for decoding one more page to tell whether anything was left out
+                    truncated = await self.stages["decode"].run(decode, next, pages, None) is not None
+                    break
+                limit = min(self.document_config.page_batch_size, max_pages - len(results))
+                decoded = await self.stages["decode"].run(decode, self._decode_pages, pages, digest, limit)
+                if not decoded:
+                    break
+                # the whole chunk is in flight at once, so its forward passes land in the same micro-batches
+                results.extend(await asyncio.gather(*(classify_page(*item) for item in decoded)))
+        finally:
+            if decoding is not None and not decoding.done():
+                # timed out or cancelled while an executor thread is still advancing the generator,
+                # closing it now would raise "generator already executing", close it once that step returns
+                decoding.add_done_callback(lambda _: pages.close())
+            else:
+                pages.close()
+
+        if not results:
+            raise ValueError("Document has no pages")
+        return {**aggregate(results), "page_count": len(results), "truncated": truncated, "pages": results}
+
+    def shutdown(self):
+        self._ocr_pool.shutdown(wait=False, cancel_futures=True)
+        self._tokenize_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,121 @@
+import os
+import json
+import joblib
+import numpy as np
+from pathlib import Path
+from PIL import Image
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from prometheus_client import Counter
+from src.DocumindAI.logging import logger
+from src.DocumindAI.entity.config_entity import VisualClassifierConfig
+from src.DocumindAI.utils.common import get_directory_fingerprint
+
+
+MODEL_FILE = "visual_classifier.joblib"
+CALIBRATION_FILE = "calibration.json"
+
+CASCADE = Counter("documind_cascade_total", "Pages answered by the visual classifier or passed on to LayoutLMv3", ["path"])
+
+
+def thumbnail_features(image: Image.Image, size: int) -> np.ndarray:
+    """Grayscale size x size thumbnail plus its row and column ink profiles, scaled to [0, 1]."""
+    thumbnail = np.asarray(image.convert("L").resize((size, size), Image.BILINEAR), dtype=np.float32) / 255.0
+    ink = 1.0 - thumbnail
+    return np.concatenate([thumbnail.ravel(), ink.mean(axis=1), ink.mean(axis=0)])
+
+
+def calibrate_threshold(confidence: np.ndarray, correct: np.ndarray, target_accuracy: float) -> float:
+    """Lowest confidence threshold whose accepted predictions are still at least target_accuracy correct.
+
+    Returns a threshold above 1.0, i.e. never short-circuit, if no threshold qualifies.
+    """
+    order = np.argsort(-confidence)
+    accepted_accuracy = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+    qualifying = np.nonzero(accepted_accuracy >= target_accuracy)[0]
+    if len(qualifying) == 0:
+        return 1.01
+    return float(confidence[order][qualifying[-1]])
+
+
+class VisualGate:
+    """First step of the cascade, answers from the page image alone when it is confident enough."""
+    def __init__(self, model, threshold: float, thumbnail_size: int, version: str = None):
+        self.model = model
+        self.threshold = threshold
+        self.thumbnail_size = thumbnail_size
+        self.version = version
+
+    @classmethod
+    def load(cls, model_dir):
+        with open(os.path.join(model_dir, CALIBRATION_FILE), "r") as f:
+            calibration = json.load(f)
+        model = joblib.load(os.path.join(model_dir, MODEL_FILE))
+        return cls(model, calibration["threshold"], calibration["thumbnail_size"],
+                   version=get_directory_fingerprint(Path(model_dir)))
+
+    def predict(self, image: Image.Image):
+        probs = self.model.predict_proba(thumbnail_features(image, self.thumbnail_size)[None, :])[0]
+        best = int(probs.argmax())
+        return str(self.model.classes_[best]), float(probs[best])
+
+    def classify(self, image: Image.Image):
+        """Returns (label, confidence) when the visual model clears the threshold, otherwise None."""
+        label, confidence = self.predict(image)
+        if confidence < self.threshold:
+            CASCADE.labels(path="layoutlmv3").inc()
+            return None
+        CASCADE.labels(path="visual").inc()
+        return label, confidence
+
+
+class VisualClassifier:
+    def __init__(self, config: VisualClassifierConfig):
+        self.config = config
+
+    def load_split(self, split: str):
+        # training only, serving imports this module for VisualGate
+        from datasets import load_from_disk
+        dataset = load_from_disk(os.path.join(self.config.data_path, split))
+        features = np.stack([
+            thumbnail_features(Image.open(path), self.config.thumbnail_size)
+            for path in dataset["image_path"]
+        ])
+        return features, np.array(dataset["label"])
+
+    def train(self):
+        print("Training the visual-only classifier")
+        train_x, train_y = self.load_split("train")
+        model = make_pipeline(
+            StandardScaler(),
+            LogisticRegression(C=self.config.C, max_iter=self.config.max_iter)
+        )
+        model.fit(train_x, train_y)
+
+        # the threshold is picked on val so test stays untouched for the cascade evaluation
+        val_x, val_y = self.load_split("val")
+        probs = model.predict_proba(val_x)
+
+        confidence = probs.max(axis=1)
+        correct = model.classes_[probs.argmax(axis=1)] == val_y
+        threshold = calibrate_threshold(confidence, correct, self.config.target_accuracy)
+        accepted = confidence >= threshold
+
+        calibration = {
+            "threshold": threshold,
+            "thumbnail_size": self.config.thumbnail_size,
+            "target_accuracy": self.config.target_accuracy,
+            "val_accuracy": float(correct.mean()),
+            "val_short_circuit_fraction": float(accepted.mean()),
+            "val_accepted_accuracy": float(correct[accepted].mean()) if accepted.any() else None,
+        }
+
+        os.makedirs(self.config.root_dir, exist_ok=True)
+        joblib.dump(model, os.path.join(self.config.root_dir, MODEL_FILE))
+        with open(os.path.join(self.config.root_dir, CALIBRATION_FILE), "w") as f:
+            json.dump(calibration, f, indent=4)
+
+        logger.info(f"Visual classifier calibration: {calibration}")
+        print(f"✅ Visual classifier saved, threshold {threshold:.3f} "
+              f"short-circuits {calibration['val_short_circuit_fraction']:.1%} of val")
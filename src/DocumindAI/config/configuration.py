@@ -1,19 +1,39 @@
+import os
 from src.DocumindAI.constants import *
 from src.DocumindAI.utils.common import read_yaml,create_directories
 from src.DocumindAI.entity.config_entity import (DataIngestionConfig,
                                    DataValidationConfig,
                                    DataPreprocessingConfig,
+                                   OCRConfig,
                                    ModelTrainerConfig,
-                                   EvaluationConfig)
+                                   QuantizationConfig,
+                                   VisualClassifierConfig,
+                                   OnnxExportConfig,
+                                   EvaluationConfig,
+                                   DistillationConfig,
+                                   ServingConfig,
+                                   HotReloadConfig,
+                                   ModelPoolConfig,
+                                   BatchingConfig,
+                                   ExecutorConfig,
+                                   PredictionCacheConfig,
+                                   UploadConfig,
+                                   BatchEndpointConfig,
+                                   PageFilterConfig,
+                                   CascadeConfig,
+                                   DocumentConfig,
+                                   StagedPipelineConfig)
 
 class ConfigurationManager:
     def __init__(
         self,
         config_filepath = CONFIG_FILE_PATH,
-        params_filepath = PARAMS_FILE_PATH):
+        params_filepath = PARAMS_FILE_PATH,
+        app_config_filepath = APP_CONFIG_FILE_PATH):
 
         self.config = read_yaml(config_filepath)
         self.params = read_yaml(params_filepath)
+        self.app_config = read_yaml(app_config_filepath)
 
         create_directories([self.config.artifacts_root])
 
@@ -55,14 +75,33 @@ class ConfigurationManager:
         data_preprocessing_config = DataPreprocessingConfig(
             root_dir=config.root_dir,
             data_path=config.data_path,
+            encoding_cache_dir = config.encoding_cache_dir,
             model = config.model,
             max_length = params.max_length,
             training_ratio = params.training_ratio,
-            batch_size = params.batch_size
+            batch_size = params.batch_size,
+            num_workers = params.num_workers,
+            train_samples = params.train_samples,
+            val_samples = params.val_samples,
+            test_samples = params.test_samples,
+            shard_size = params.shard_size
         )
 
         return data_preprocessing_config
 
+    def get_ocr_config(self) -> OCRConfig:
+        config = self.config.ocr
+
+        create_directories([config.cache_dir])
+
+        ocr_config = OCRConfig(
+            cache_dir=config.cache_dir,
+            lang=config.lang,
+            tesseract_config=config.tesseract_config
+        )
+
+        return ocr_config
+
     def get_model_trainer_config(self) -> ModelTrainerConfig:
         config = self.config.model_trainer
         params = self.params.TrainingArguments
@@ -85,11 +124,56 @@ class ConfigurationManager:
             gradient_accumulation_steps = params.gradient_accumulation_steps,
             weight_decay = params.weight_decay,
             optim = params.optim,
-            number_of_unfreeze_layers = params.number_of_unfreeze_layers
+            number_of_unfreeze_layers = params.number_of_unfreeze_layers,
+            streaming = params.streaming,
+            shuffle_buffer_size = params.shuffle_buffer_size,
+            dataloader_num_workers = params.dataloader_num_workers,
+            dataloader_prefetch_factor = params.dataloader_prefetch_factor
         )
 
         return model_trainer_config  
     
+    def get_quantization_config(self) -> QuantizationConfig:
+        config = self.config.model_trainer
+
+        quantization_config = QuantizationConfig(
+            model_path=os.path.join(config.root_dir, "documind_model"),
+            quantized_model_path=config.quantized_model_path
+        )
+
+        return quantization_config
+
+    def get_visual_classifier_config(self) -> VisualClassifierConfig:
+        config = self.config.visual_classifier
+        params = self.params.visual_classifier
+
+        create_directories([config.root_dir])
+
+        visual_classifier_config = VisualClassifierConfig(
+            root_dir=config.root_dir,
+            data_path=config.data_path,
+            thumbnail_size=params.thumbnail_size,
+            C=params.C,
+            max_iter=params.max_iter,
+            target_accuracy=params.target_accuracy
+        )
+
+        return visual_classifier_config
+
+    def get_onnx_export_config(self) -> OnnxExportConfig:
+        config = self.config.onnx_export
+
+        create_directories([config.root_dir])
+
+        onnx_export_config = OnnxExportConfig(
+            root_dir=config.root_dir,
+            model_path=config.model_path,
+            opset_version=config.opset_version,
+            atol=config.atol
+        )
+
+        return onnx_export_config
+
     def get_evaluation_config(self) -> EvaluationConfig:
         config = self.config.model_evaluation
         params = self.params.TrainingArguments
@@ -99,6 +183,193 @@ class ConfigurationManager:
             model_path = config.model_path,
             data_path = config.data_path,
             mlflow_uri= config.mlflow_uri,
-            all_params= params
+            all_params= params,
+            quantized_model_path= config.quantized_model_path,
+            promotion_file= config.promotion_file,
+            max_f1_drop= self.params.quantization.max_f1_drop,
+            raw_data_path= config.raw_data_path,
+            visual_classifier_path= config.visual_classifier_path,
+            cascade_latency_samples= self.params.cascade.latency_samples
+        )
+        return eval_config
+
+    def get_distillation_config(self) -> DistillationConfig:
+        config = self.config.distillation
+        params = self.params.distillation
+
+        create_directories([config.root_dir])
+
+        distillation_config = DistillationConfig(
+            root_dir=config.root_dir,
+            data_path=config.data_path,
+            teacher_model_path=config.teacher_model_path,
+            student_model_path=config.student_model_path,
+            num_hidden_layers=params.num_hidden_layers,
+            hidden_size=params.hidden_size,
+            num_attention_heads=params.num_attention_heads,
+            intermediate_size=params.intermediate_size,
+            temperature=params.temperature,
+            alpha=params.alpha,
+            num_train_epochs=params.num_train_epochs,
+            per_device_train_batch_size=params.per_device_train_batch_size,
+            learning_rate=params.learning_rate,
+            latency_samples=params.latency_samples
+        )
+
+        return distillation_config
+
+    def get_serving_workers(self) -> int:
+        return int(os.getenv("WEB_CONCURRENCY", self.app_config.serving.workers))
+
+    def get_cores_per_worker(self) -> int:
+        return max(1, (os.cpu_count() or 1) // self.get_serving_workers())
+
+    def get_serving_config(self) -> ServingConfig:
+        config = self.app_config.serving
+        hot_reload = config.hot_reload
+        # a retrain rewrites the watched model.safetensors in place, which a live mapping
+        # would see as changed weights or SIGBUS, so local hot reload loads into the heap
+        local_reload = hot_reload.enabled and hot_reload.source == "local"
+
+        serving_config = ServingConfig(
+            model_path = config.model_path,
+            quantized_model_path = config.quantized_model_path,
+            promotion_file = config.promotion_file,
+            student_model_path = config.student_model_path,
+            precision = os.getenv("DOCUMIND_PRECISION", config.precision),
+            variant = os.getenv("DOCUMIND_VARIANT", config.variant),
+            backend = os.getenv("DOCUMIND_BACKEND", config.backend),
+            onnx_model_path = config.onnx_model_path,
+            onnx_threads = config.onnx_threads or self.get_cores_per_worker(),
+            mmap_weights = config.mmap_weights and not local_reload,
+            workers = self.get_serving_workers(),
+            torch_threads = config.torch_threads or self.get_cores_per_worker(),
+            id2label_path = config.id2label_path,
+            max_length = config.max_length,
+            warmup_iterations = config.warmup_iterations
+        )
+        return serving_config
+
+    def get_hot_reload_config(self) -> HotReloadConfig:
+        config = self.app_config.serving.hot_reload
+
+        hot_reload_config = HotReloadConfig(
+            enabled = config.enabled,
+            source = config.source,
+            poll_interval_seconds = config.poll_interval_seconds,
+            # the same tracking server ModelEvaluation registers the champion on
+            mlflow_uri = self.config.model_evaluation.mlflow_uri,
+            registered_model_name = config.registered_model_name,
+            alias = config.alias,
+            download_dir = config.download_dir
+        )
+        return hot_reload_config
+
+    def get_model_pool_config(self) -> ModelPoolConfig:
+        config = self.app_config.serving.model_pool
+
+        model_pool_config = ModelPoolConfig(
+            versions = dict(config.versions),
+            memory_budget_mb = config.memory_budget_mb,
+            pinned_workers = config.pinned_workers,
+            shadow_version = config.shadow_version,
+            shadow_sample_fraction = config.shadow_sample_fraction
+        )
+        return model_pool_config
+
+    def get_batching_config(self) -> BatchingConfig:
+        config = self.app_config.serving.batching
+
+        batching_config = BatchingConfig(
+            max_batch_size = config.max_batch_size,
+            max_wait_ms = config.max_wait_ms,
+            max_queue_size = config.max_queue_size,
+            length_buckets = sorted(config.length_buckets)
+        )
+        return batching_config
+
+    def get_executor_config(self) -> ExecutorConfig:
+        config = self.app_config.serving.executor
+
+        executor_config = ExecutorConfig(
+            workers = config.workers,
+            max_pending = config.max_pending,
+            request_timeout_seconds = config.request_timeout_seconds,
+            retry_after_seconds = config.retry_after_seconds
+        )
+        return executor_config
+
+    def get_prediction_cache_config(self) -> PredictionCacheConfig:
+        config = self.app_config.serving.prediction_cache
+
+        prediction_cache_config = PredictionCacheConfig(
+            max_entries = config.max_entries,
+            disk_enabled = config.disk_enabled,
+            disk_dir = config.disk_dir,
+            disk_size_limit_mb = config.disk_size_limit_mb
+        )
+        return prediction_cache_config
+
+    def get_upload_config(self) -> UploadConfig:
+        config = self.app_config.serving.uploads
+
+        upload_config = UploadConfig(
+            max_file_size = config.max_file_size,
+            max_request_size = config.max_request_size
+        )
+        return upload_config
+
+    def get_batch_endpoint_config(self) -> BatchEndpointConfig:
+        config = self.app_config.serving.batch_endpoint
+
+        batch_endpoint_config = BatchEndpointConfig(
+            max_files = config.max_files,
+            max_concurrency = config.max_concurrency
+        )
+        return batch_endpoint_config
+
+    def get_page_filter_config(self) -> PageFilterConfig:
+        config = self.app_config.serving.page_filter
+
+        page_filter_config = PageFilterConfig(
+            enabled = config.enabled,
+            thumbnail_size = config.thumbnail_size,
+            ink_level = config.ink_level,
+            min_ink_density = config.min_ink_density,
+            min_std = config.min_std,
+            paper_level = config.paper_level,
+            min_paper_fraction = config.min_paper_fraction,
+            max_saturation = config.max_saturation,
+            min_aspect = config.min_aspect,
+            max_aspect = config.max_aspect
+        )
+        return page_filter_config
+
+    def get_cascade_config(self) -> CascadeConfig:
+        config = self.app_config.serving.cascade
+
+        cascade_config = CascadeConfig(
+            enabled = os.getenv("DOCUMIND_CASCADE", str(config.enabled)).lower() in ("1", "true"),
+            model_path = config.model_path
+        )
+        return cascade_config
+
+    def get_document_config(self) -> DocumentConfig:
+        config = self.app_config.serving.documents
+
+        document_config = DocumentConfig(
+            pdf_dpi = config.pdf_dpi,
+            page_batch_size = config.page_batch_size,
+            max_pages = config.max_pages
+        )
+        return document_config
+
+    def get_staged_pipeline_config(self) -> StagedPipelineConfig:
+        config = self.app_config.serving.pipeline
+
+        staged_pipeline_config = StagedPipelineConfig(
+            ocr_workers = config.ocr_workers or self.get_cores_per_worker(),
+            tokenize_workers = config.tokenize_workers,
+            stage_capacity = config.stage_capacity
         )
-        return eval_config         
\ No newline at end of file
+        return staged_pipeline_config
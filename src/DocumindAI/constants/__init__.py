@@ -1,4 +1,5 @@
 from pathlib import Path
 
 CONFIG_FILE_PATH = Path("config/config.yaml")
-PARAMS_FILE_PATH = Path("params.yaml")
\ No newline at end of file
+PARAMS_FILE_PATH = Path("params.yaml")
+APP_CONFIG_FILE_PATH = Path("config/app_config.yaml")
\ No newline at end of file
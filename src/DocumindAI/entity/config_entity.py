@@ -18,10 +18,22 @@ class DataValidationConfig:
 class DataPreprocessingConfig:
     root_dir: Path
     data_path: Path
+    encoding_cache_dir: Path
     model: Path
     max_length: int
     training_ratio: float
-    batch_size: int    
+    batch_size: int
+    num_workers: int
+    train_samples: int
+    val_samples: int
+    test_samples: int
+    shard_size: int
+
+@dataclass(frozen=True)
+class OCRConfig:
+    cache_dir: Path
+    lang: str
+    tesseract_config: str
 
 @dataclass(frozen=True)
 class ModelTrainerConfig:
@@ -41,6 +53,31 @@ class ModelTrainerConfig:
     remove_unused_columns: bool
     optim: str
     number_of_unfreeze_layers : int
+    streaming: bool
+    shuffle_buffer_size: int
+    dataloader_num_workers: int
+    dataloader_prefetch_factor: int
+
+@dataclass(frozen=True)
+class QuantizationConfig:
+    model_path: Path
+    quantized_model_path: Path
+
+@dataclass(frozen=True)
+class VisualClassifierConfig:
+    root_dir: Path
+    data_path: Path
+    thumbnail_size: int
+    C: float
+    max_iter: int
+    target_accuracy: float
+
+@dataclass(frozen=True)
+class OnnxExportConfig:
+    root_dir: Path
+    model_path: Path
+    opset_version: int
+    atol: float
 
 @dataclass(frozen=True)
 class EvaluationConfig:
@@ -48,4 +85,124 @@ class EvaluationConfig:
     model_path: Path
     data_path: Path
     all_params: dict
-    mlflow_uri: str    
\ No newline at end of file
+    mlflow_uri: str
+    quantized_model_path: Path
+    promotion_file: Path
+    max_f1_drop: float
+    raw_data_path: Path
+    visual_classifier_path: Path
+    cascade_latency_samples: int
+
+@dataclass(frozen=True)
+class DistillationConfig:
+    root_dir: Path
+    data_path: Path
+    teacher_model_path: Path
+    student_model_path: Path
+    num_hidden_layers: int
+    hidden_size: int
+    num_attention_heads: int
+    intermediate_size: int
+    temperature: float
+    alpha: float
+    num_train_epochs: int
+    per_device_train_batch_size: int
+    learning_rate: float
+    latency_samples: int
+
+@dataclass(frozen=True)
+class ServingConfig:
+    model_path: Path
+    quantized_model_path: Path
+    promotion_file: Path
+    student_model_path: Path
+    precision: str
+    variant: str
+    backend: str
+    onnx_model_path: Path
+    onnx_threads: int
+    mmap_weights: bool
+    workers: int
+    torch_threads: int
+    id2label_path: Path
+    max_length: int
+    warmup_iterations: int
+
+@dataclass(frozen=True)
+class HotReloadConfig:
+    enabled: bool
+    source: str
+    poll_interval_seconds: float
+    mlflow_uri: str
+    registered_model_name: str
+    alias: str
+    download_dir: Path
+
+@dataclass(frozen=True)
+class ModelPoolConfig:
+    versions: dict
+    memory_budget_mb: int
+    pinned_workers: int
+    shadow_version: str
+    shadow_sample_fraction: float
+
+@dataclass(frozen=True)
+class BatchingConfig:
+    max_batch_size: int
+    max_wait_ms: float
+    max_queue_size: int
+    length_buckets: list
+
+@dataclass(frozen=True)
+class ExecutorConfig:
+    workers: int
+    max_pending: int
+    request_timeout_seconds: float
+    retry_after_seconds: int
+
+@dataclass(frozen=True)
+class PredictionCacheConfig:
+    max_entries: int
+    disk_enabled: bool
+    disk_dir: Path
+    disk_size_limit_mb: int
+
+@dataclass(frozen=True)
+class UploadConfig:
+    max_file_size: int
+    max_request_size: int
+
+@dataclass(frozen=True)
+class BatchEndpointConfig:
+    max_files: int
+    max_concurrency: int
+
+@dataclass(frozen=True)
+class PageFilterConfig:
+    enabled: bool
+    thumbnail_size: int
+    ink_level: int
+    min_ink_density: float
+    min_std: float
+    paper_level: int
+    min_paper_fraction: float
+    max_saturation: float
+    min_aspect: float
+    max_aspect: float
+
+@dataclass(frozen=True)
+class CascadeConfig:
+    enabled: bool
+    model_path: Path
+
+@dataclass(frozen=True)
+class DocumentConfig:
+    pdf_dpi: int
+    page_batch_size: int
+    max_pages: int
+
+@dataclass(frozen=True)
+class StagedPipelineConfig:
+    ocr_workers: int
+    tokenize_workers: int
+    stage_capacity: int
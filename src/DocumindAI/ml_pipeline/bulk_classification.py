@@ -0,0 +1,271 @@
+import io
+import os
+import csv
+import glob
+import json
+import time
+import hashlib
+import argparse
+import itertools
+import dataclasses
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from src.DocumindAI.config.configuration import ConfigurationManager
+from src.DocumindAI.components.model_registry import ModelRegistry
+from src.DocumindAI.components.document_pages import Page, is_multipage, iter_pages, aggregate
+from src.DocumindAI.components.page_filter import screen
+from src.DocumindAI.ml_pipeline.prediction import get_ocr_engine, get_page_filter, get_visual_gate
+from src.DocumindAI.utils.padding import pad_encodings
+from src.DocumindAI.logging import logger
+
+
+DOCUMENT_SUFFIXES = ('.tif', '.tiff', '.png', '.jpg', '.jpeg', '.pdf')
+
+
+def list_inputs(source: str) -> list:
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names if name.lower().endswith(DOCUMENT_SUFFIXES)
+        ]
+    elif source.lower().endswith(".csv"):
+        with open(source, newline="") as f:
+            paths = [row["image_path"] for row in csv.DictReader(f)]
+    else:
+        with open(source) as f:
+            paths = [line.strip() for line in f if line.strip()]
+    return sorted(paths)
+
+
+def completed_paths(output_dir: str) -> set:
+    """Files that already have a successful result in any part file."""
+    done = set()
+    for part in glob.glob(os.path.join(output_dir, "part-*.jsonl")):
+        with open(part) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line of a killed run, the file is simply classified again
+                    continue
+                if "error" not in record:
+                    done.add(record["path"])
+    parquet_parts = glob.glob(os.path.join(output_dir, "part-*.parquet"))
+    if parquet_parts:
+        import pyarrow.parquet as pq
+        for part in parquet_parts:
+            table = pq.read_table(part, columns=["path", "error"])
+            for path, error in zip(table["path"].to_pylist(), table["error"].to_pylist()):
+                if error is None:
+                    done.add(path)
+    return done
+
+
+def drop_partial_line(path: str):
+    """Truncates a JSONL file after its last complete line, what a killed run left of its last write."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - 64 * 1024)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class PartWriter:
+    """Appends one worker's results, each write is durable before the next batch starts."""
+    def __init__(self, output_dir: str, worker_id: int, output_format: str):
+        self.output_dir = output_dir
+        self.worker_id = worker_id
+        self.output_format = output_format
+        if output_format == "jsonl":
+            # appending onto a cut-off record would corrupt the first new one too
+            drop_partial_line(os.path.join(output_dir, f"part-{worker_id:03d}.jsonl"))
+
+    def write(self, records: list):
+        if not records:
+            return
+        if self.output_format == "jsonl":
+            with open(os.path.join(self.output_dir, f"part-{self.worker_id:03d}.jsonl"), "a") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        # parquet files cannot be appended to, every checkpoint is its own part
+        existing = len(glob.glob(os.path.join(self.output_dir, f"part-{self.worker_id:03d}-*.parquet")))
+        path = os.path.join(self.output_dir, f"part-{self.worker_id:03d}-{existing:06d}.parquet")
+        rows = [{**record, "pages": json.dumps(record.get("pages"))} for record in records]
+        columns = ["path", "label", "confidence", "page_count", "pages", "error"]
+        table = pa.Table.from_pylist([{c: row.get(c) for c in columns} for row in rows])
+        pq.write_table(table, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+
+class BulkClassifier:
+    """One model instance per process, fed with length-sorted batches of pages."""
+    def __init__(self, batch_size: int, threads: int):
+        config = ConfigurationManager()
+        serving_config = dataclasses.replace(config.get_serving_config(), torch_threads=threads, onnx_threads=threads)
+        self.document_config = config.get_document_config()
+        self.registry = ModelRegistry(config=serving_config)
+        self.registry.load()
+        self.pad_id = self.registry.get().processor.tokenizer.pad_token_id
+        self.ocr = get_ocr_engine()
+        self.page_filter = get_page_filter()
+        self.visual_gate = get_visual_gate()
+        self.batch_size = batch_size
+
+    def prepare(self, path: str) -> list:
+        """Per-page answers or encodings of one file, multi-page files stop at max_pages."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if is_multipage(data):
+            digest = hashlib.sha256(data).hexdigest()
+            pages = iter_pages(data, self.document_config.pdf_dpi)
+        else:
+            digest = None
+            pages = (page for page in [Page(1, Image.open(io.BytesIO(data)).convert("RGB"))])
+
+        items = []
+        try:
+            for page in itertools.islice(pages, self.document_config.max_pages):
+                answer = screen(self.page_filter, self.visual_gate, page.image)
+                if answer is not None:
+                    items.append((page.number, answer))
+                    continue
+                if page.words is not None:
+                    words, boxes = page.words, page.boxes
+                elif digest is None:
+                    words, boxes = self.ocr.ocr_bytes(data, page.image)
+                else:
+                    words, boxes = self.ocr.ocr_bytes(f"{digest}:{page.number}".encode(), page.image)
+                items.append((page.number, self.registry.encode(page.image, words, boxes)))
+        finally:
+            pages.close()
+        if not items:
+            raise ValueError("Document has no pages")
+        return items
+
+    def forward(self, encodings: list) -> list:
+        """Decoded (label, confidence) per encoding, padded per batch to its own longest sequence."""
+        order = sorted(range(len(encodings)), key=lambda i: encodings[i]["input_ids"].shape[1])
+        results = [None] * len(encodings)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            logits = self.registry.forward(pad_encodings([encodings[i] for i in indices], self.pad_id))
+            for row, i in enumerate(indices):
+                results[i] = self.registry.decode(logits[row])
+        return results
+
+    def flush(self, pending: list) -> list:
+        encodings = [item for _, items in pending for _, item in items if "input_ids" in item]
+        decoded = iter(self.forward(encodings)) if encodings else iter([])
+
+        records = []
+        for path, items in pending:
+            pages = []
+            for number, item in items:
+                if "input_ids" in item:
+                    label, confidence = next(decoded)
+                    item = {"label": label, "confidence": confidence}
+                pages.append({"page": number, **item})
+            records.append({"path": path, **aggregate(pages), "page_count": len(pages), "pages": pages})
+        return records
+
+
+def run_worker(worker_id: int, paths: list, output_dir: str, output_format: str, batch_size: int, threads: int) -> dict:
+    # tesseract runs in this process, one thread each like the serving OCR pool
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    classifier = BulkClassifier(batch_size=batch_size, threads=threads)
+    writer = PartWriter(output_dir, worker_id, output_format)
+
+    started = time.perf_counter()
+    files, images, failed = 0, 0, 0
+    pending, pending_pages = [], 0
+
+    def flush():
+        records = classifier.flush(pending)
+        writer.write(records)
+        pending.clear()
+        return len(records), sum(record["page_count"] for record in records)
+
+    for path in paths:
+        try:
+            items = classifier.prepare(path)
+        except Exception as e:
+            logger.warning(f"worker {worker_id}: {path} failed: {e}")
+            writer.write([{"path": path, "error": str(e)}])
+            failed += 1
+            continue
+        pending.append((path, items))
+        pending_pages += len(items)
+
+        if pending_pages >= batch_size:
+            done_files, done_images = flush()
+            files, images, pending_pages = files + done_files, images + done_images, 0
+            rate = images / (time.perf_counter() - started)
+            logger.info(f"worker {worker_id}: {files}/{len(paths)} files, {rate:.2f} images/sec")
+
+    if pending:
+        done_files, done_images = flush()
+        files, images = files + done_files, images + done_images
+
+    elapsed = time.perf_counter() - started
+    return {"worker": worker_id, "files": files, "images": images, "failed": failed,
+            "seconds": elapsed, "images_per_sec": images / elapsed if elapsed else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify a directory or manifest of scans offline, rerunning resumes where it stopped")
+    parser.add_argument("source", help="directory of scans, or a manifest (.txt one path per line, .csv with image_path)")
+    parser.add_argument("--output", default=os.path.join("artifacts", "bulk_classification"))
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 4))
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    paths = list_inputs(args.source)
+    done = completed_paths(args.output)
+    todo = [path for path in paths if path not in done]
+    print(f"{len(paths)} files, {len(done)} already classified, {len(todo)} to go on {args.workers} workers")
+    if not todo:
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    shards = [todo[w::args.workers] for w in range(args.workers)]
+
+    # spawn, every worker builds its own model and torch thread pool
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(run_worker, w, shard, args.output, args.format, args.batch_size, threads)
+            for w, shard in enumerate(shards) if shard
+        ]
+        stats = [future.result() for future in futures]
+
+    for s in stats:
+        print(f"worker {s['worker']:>3}: {s['files']:>7} files {s['images']:>7} images "
+              f"{s['failed']:>5} failed  {s['images_per_sec']:8.2f} images/sec")
+    total_seconds = max(s["seconds"] for s in stats)
+    total_images = sum(s["images"] for s in stats)
+    print(f"total: {total_images} images in {total_seconds:.1f}s, {total_images / total_seconds:.2f} images/sec")
+
+
+if __name__ == "__main__":
+    main()
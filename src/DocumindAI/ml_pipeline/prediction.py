@@ -1,53 +1,194 @@
-import torch
-from transformers import LayoutLMv3ForSequenceClassification, AutoProcessor
-from PIL import Image
-import os
-import json
+import asyncio
+import threading
 from src.DocumindAI.config.configuration import ConfigurationManager
-
+from src.DocumindAI.components.model_registry import ModelRegistry
+from src.DocumindAI.components.batching_engine import MicroBatcher
+from src.DocumindAI.components.inference_executor import InferenceExecutor
+from src.DocumindAI.components.prediction_cache import PredictionCache
+from src.DocumindAI.components.ocr import OCREngine
+from src.DocumindAI.components.page_filter import PageFilter
+from src.DocumindAI.components.model_watcher import ModelWatcher
+from src.DocumindAI.components.model_pool import ModelPool
+from src.DocumindAI.components.visual_classifier import VisualGate
+from src.DocumindAI.logging import logger
+from src.DocumindAI.components.staged_pipeline import StagedPipeline
+
+
+_registry = None
+_engine = None
+_executor = None
+_cache = None
+_ocr = None
+_page_filter = None
+_visual_gate = None
+_visual_gate_checked = False
+_staged = None
+_watcher = None
+_pool = None
+_loop = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Returns the process-wide model registry, creating it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            serving_config = ConfigurationManager().get_serving_config()
+            _registry = ModelRegistry(config=serving_config)
+    return _registry
+
+
+def get_inference_engine() -> MicroBatcher:
+    """Returns the process-wide micro-batching engine, starting it on first use."""
+    global _engine
+    registry = get_model_registry()
+    with _registry_lock:
+        if _engine is None:
+            batching_config = ConfigurationManager().get_batching_config()
+            _engine = MicroBatcher(registry=registry, config=batching_config).start()
+    return _engine
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Returns the process-wide executor used for blocking decode/OCR work."""
+    global _executor
+    with _registry_lock:
+        if _executor is None:
+            executor_config = ConfigurationManager().get_executor_config()
+            _executor = InferenceExecutor(config=executor_config)
+    return _executor
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Returns the process-wide content-hash prediction cache."""
+    global _cache
+    with _registry_lock:
+        if _cache is None:
+            cache_config = ConfigurationManager().get_prediction_cache_config()
+            _cache = PredictionCache(config=cache_config)
+    return _cache
+
+
+def get_ocr_engine() -> OCREngine:
+    """Returns the process-wide OCR engine backed by the shared on-disk store."""
+    global _ocr
+    with _registry_lock:
+        if _ocr is None:
+            ocr_config = ConfigurationManager().get_ocr_config()
+            _ocr = OCREngine(config=ocr_config)
+    return _ocr
+
+
+def get_page_filter() -> PageFilter:
+    """Returns the process-wide blank-page / non-document filter."""
+    global _page_filter
+    with _registry_lock:
+        if _page_filter is None:
+            page_filter_config = ConfigurationManager().get_page_filter_config()
+            _page_filter = PageFilter(config=page_filter_config)
+    return _page_filter
+
+
+def get_visual_gate():
+    """Returns the cascade's visual classifier, or None when cascade mode is off or it was never trained."""
+    global _visual_gate, _visual_gate_checked
+    with _registry_lock:
+        if not _visual_gate_checked:
+            _visual_gate_checked = True
+            cascade_config = ConfigurationManager().get_cascade_config()
+            if cascade_config.enabled:
+                try:
+                    _visual_gate = VisualGate.load(cascade_config.model_path)
+                except FileNotFoundError:
+                    logger.warning(f"Cascade enabled but no visual classifier at {cascade_config.model_path}")
+    return _visual_gate
+
+
+def get_model_pool() -> ModelPool:
+    """Returns the process-wide pool of pinnable and shadow model versions."""
+    global _pool
+    registry = get_model_registry()
+    with _registry_lock:
+        if _pool is None:
+            model_pool_config = ConfigurationManager().get_model_pool_config()
+            _pool = ModelPool(registry=registry, config=model_pool_config)
+    return _pool
+
+
+def get_staged_pipeline() -> StagedPipeline:
+    """Returns the process-wide decode -> OCR -> tokenize -> forward serving pipeline."""
+    global _staged
+    registry = get_model_registry()
+    engine = get_inference_engine()
+    ocr = get_ocr_engine()
+    executor = get_inference_executor()
+    page_filter = get_page_filter()
+    visual_gate = get_visual_gate()
+    pool = get_model_pool()
+    with _registry_lock:
+        if _staged is None:
+            config = ConfigurationManager()
+            _staged = StagedPipeline(registry=registry, engine=engine, ocr=ocr, executor=executor,
+                                     page_filter=page_filter, config=config.get_staged_pipeline_config(),
+                                     document_config=config.get_document_config(), visual_gate=visual_gate,
+                                     pool=pool)
+    return _staged
+
+
+def start_model_watcher():
+    """Starts hot reloading when serving.hot_reload is enabled, call once the model is warm."""
+    global _watcher
+    registry = get_model_registry()
+    pool = get_model_pool()
+    with _registry_lock:
+        if _watcher is None:
+            hot_reload_config = ConfigurationManager().get_hot_reload_config()
+            if hot_reload_config.enabled:
+                _watcher = ModelWatcher(registry=registry, config=hot_reload_config, pool=pool).start()
+    return _watcher
+
+
+def run_sync(coroutine):
+    """Runs a StagedPipeline coroutine from synchronous code on one shared background event loop.
+
+    The stage queues bind to the first loop that waits on them, so every
+    synchronous caller goes through the same loop instead of asyncio.run.
+    """
+    global _loop
+    with _registry_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="documind-sync-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coroutine, _loop).result()
+
+
+def shutdown_serving():
+    """Stops the pools and threads started by the accessors above."""
+    if _watcher is not None:
+        _watcher.stop()
+    if _staged is not None:
+        _staged.shutdown()
+    if _pool is not None:
+        _pool.shutdown()
+    if _engine is not None:
+        _engine.stop()
+    if _executor is not None:
+        _executor.shutdown()
+    if _loop is not None:
+        _loop.call_soon_threadsafe(_loop.stop)
 
 
 class PredictionPipeline:
-    def __init__(self,filename):
+    def __init__(self,filename=None,staged: StagedPipeline = None):
         self.filename =filename
-        self.config = ConfigurationManager().get_evaluation_config()
-
+        # created on the first predict, so building the pipeline doesn't start the OCR process pool
+        self.staged = staged
 
-    
     def predict(self):
-        processor = AutoProcessor.from_pretrained(self.config.model_path)
-        model = LayoutLMv3ForSequenceClassification.from_pretrained(self.config.model_path)
-        model.eval()
-
-        image = Image.open(self.filename).convert("RGB")
-
-        encoding = processor(
-            images=image,
-            padding="max_length",
-            truncation=True,
-            max_length=512,
-            return_tensors="pt"
-        )
-
-        encoding = {k:v for k,v in encoding.items()}
-
-        with torch.no_grad():
-            outputs = model(**encoding)
-
-        logits = outputs.logits
-        probs = torch.softmax(logits,dim=-1)
-
-        predicted_id = int(probs.argmax(dim=-1).item())
-        confidence = float(probs.max().item())
-
-        with open(os.path.join("config","id2label.json"),"r") as f:
-            id2label = json.load(f)
-        
-        id2label = {int(k):v for k,v in id2label.items()}
-
-        predicted_label = id2label[predicted_id]  
-
-        return predicted_label, confidence  
-
-
-
+        with open(self.filename, "rb") as f:
+            data = f.read()
+        # the same path as /predict: screening, cached OCR, batched forward, PDFs and TIFFs page by page
+        staged = self.staged or get_staged_pipeline()
+        result = run_sync(staged.classify(data))
+        return result["label"], result["confidence"]
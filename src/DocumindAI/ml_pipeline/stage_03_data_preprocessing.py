@@ -9,5 +9,6 @@ class DataPreprocessingTrainingPipeline:
     def main(self):
         config = ConfigurationManager()
         data_preprocessing_config = config.get_data_preprocessing_config()
-        data_preprocessing = DataPreprocessing(config=data_preprocessing_config)
+        ocr_config = config.get_ocr_config()
+        data_preprocessing = DataPreprocessing(config=data_preprocessing_config, ocr_config=ocr_config)
         data_preprocessing.preprocess()
\ No newline at end of file
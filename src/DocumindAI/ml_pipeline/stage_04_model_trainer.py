@@ -1,5 +1,6 @@
 from src.DocumindAI.config.configuration import ConfigurationManager
 from src.DocumindAI.components.model_trainer import ModelTrainer
+from src.DocumindAI.components.model_quantization import ModelQuantization
 
 
 class ModelTrainerTrainingPipeline:
@@ -10,4 +11,8 @@ class ModelTrainerTrainingPipeline:
         config = ConfigurationManager()
         model_trainer_config = config.get_model_trainer_config()
         model_trainer_config = ModelTrainer(config=model_trainer_config)
-        model_trainer_config.train()
\ No newline at end of file
+        model_trainer_config.train()
+
+        quantization_config = config.get_quantization_config()
+        model_quantization = ModelQuantization(config=quantization_config)
+        model_quantization.quantize_model()
\ No newline at end of file
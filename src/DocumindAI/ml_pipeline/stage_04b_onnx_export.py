@@ -0,0 +1,14 @@
+from src.DocumindAI.config.configuration import ConfigurationManager
+from src.DocumindAI.components.onnx_export import OnnxExport
+
+
+class OnnxExportPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        onnx_export_config = config.get_onnx_export_config()
+        onnx_export = OnnxExport(config=onnx_export_config)
+        model = onnx_export.export()
+        onnx_export.validate(model)
\ No newline at end of file
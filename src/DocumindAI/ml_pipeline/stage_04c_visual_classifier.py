@@ -0,0 +1,13 @@
+from src.DocumindAI.config.configuration import ConfigurationManager
+from src.DocumindAI.components.visual_classifier import VisualClassifier
+
+
+class VisualClassifierTrainingPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        visual_classifier_config = config.get_visual_classifier_config()
+        visual_classifier = VisualClassifier(config=visual_classifier_config)
+        visual_classifier.train()
\ No newline at end of file
@@ -9,7 +9,10 @@ class ModelEvaluationPipeline:
     def main(self):
         config = ConfigurationManager()
         eval_config = config.get_evaluation_config()
-        evaluation = ModelEvaluation(eval_config)
+        ocr_config = config.get_ocr_config()
+        evaluation = ModelEvaluation(eval_config, ocr_config)
         evaluation.evaluation()
+        evaluation.evaluate_quantized()
+        evaluation.evaluate_cascade()
         evaluation.log_into_mlflow()
         evaluation.register_model()
\ No newline at end of file
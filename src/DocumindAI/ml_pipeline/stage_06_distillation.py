@@ -0,0 +1,13 @@
+from src.DocumindAI.config.configuration import ConfigurationManager
+from src.DocumindAI.components.distillation import Distillation
+
+
+class DistillationTrainingPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        distillation_config = config.get_distillation_config()
+        distillation = Distillation(config=distillation_config)
+        distillation.distill()
\ No newline at end of file
@@ -7,6 +7,7 @@ from box import ConfigBox
 from pathlib import Path
 from typing import Any
 import json
+import hashlib
 
 @ensure_annotations
 def read_yaml(path_to_yaml: Path) -> ConfigBox:
@@ -72,4 +73,53 @@ def save_json(path: Path, data: dict):
     with open(path, "w") as f:
         json.dump(data, f, indent=4)
 
-    logger.info(f"json file saved at: {path}")
\ No newline at end of file
+    logger.info(f"json file saved at: {path}")
+
+
+@ensure_annotations
+def get_directory_fingerprint(path: Path) -> str:
+    """short fingerprint of a directory built from file names, sizes and mtimes
+
+    Args:
+        path (Path): directory to fingerprint
+
+    Returns:
+        str: 12 character hex digest
+    """
+    digest = hashlib.sha256()
+    for file in sorted(Path(path).rglob("*")):
+        if file.is_file():
+            stat = file.stat()
+            digest.update(f"{file.relative_to(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+
+WEIGHT_SUFFIXES = (".safetensors", ".bin", ".onnx")
+_weights_fingerprints = {}
+
+
+@ensure_annotations
+def get_weights_fingerprint(path: Path) -> str:
+    """short fingerprint of the weight files in a model directory, built from their contents
+
+    Unlike get_directory_fingerprint it survives copies that change mtimes
+    (dvc checkout, cp, container layers). The digest is remembered per
+    directory fingerprint, so the files are only read again once they change.
+
+    Args:
+        path (Path): model directory to fingerprint
+
+    Returns:
+        str: 12 character hex digest
+    """
+    stat_key = (str(path), get_directory_fingerprint(path))
+    if stat_key not in _weights_fingerprints:
+        digest = hashlib.sha256()
+        for file in sorted(Path(path).rglob("*")):
+            if file.is_file() and file.suffix in WEIGHT_SUFFIXES:
+                digest.update(str(file.relative_to(path)).encode())
+                with open(file, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+        _weights_fingerprints[stat_key] = digest.hexdigest()[:12]
+    return _weights_fingerprints[stat_key]
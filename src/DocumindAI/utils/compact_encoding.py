@@ -0,0 +1,129 @@
+import warnings
+import numpy as np
+import pyarrow.compute as pc
+import torch
+from datasets import Array3D, Features, Sequence, Value
+
+# encoded rows on disk: uint8 pixels before rescaling and normalization, int32 token ids,
+# int16 boxes (0-1000) and unpadded sequences, Arrow keeps the offsets of each list
+ENCODING_FORMAT = "compact-v1"
+
+
+def compact_features(image_size: dict) -> Features:
+    """datasets features of a compact encoded row
+
+    Args:
+        image_size (dict): image processor size, with height and width
+
+    Returns:
+        Features: input_ids, bbox and pixel_values columns
+    """
+    return Features({
+        "input_ids": Sequence(Value("int32")),
+        "bbox": Sequence(Sequence(Value("int16"), length=4)),
+        "pixel_values": Array3D(shape=(3, image_size["height"], image_size["width"]), dtype="uint8"),
+    })
+
+
+def sequence_lengths(dataset) -> list:
+    """token count of every row, computed from the Arrow list offsets
+
+    Args:
+        dataset (Dataset): compact encoded split
+
+    Returns:
+        list: number of tokens per row
+    """
+    return pc.list_value_length(dataset.with_format("arrow")["input_ids"]).to_pylist()
+
+
+def single_chunk(column):
+    """the column as one Arrow array, only copied when a batch spans two files"""
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+class CompactCollator:
+    """Expands compact rows into model inputs, padded to the longest sequence of the batch.
+
+    Used as the Trainer data_collator on a list of rows, through expand on a
+    sliced batch (`dataset[indices]`) and through expand_table on the Arrow
+    rows of a batch. Columns other than the encoding, such as labels or
+    teacher_logits, are stacked as they are.
+    """
+    def __init__(self, processor):
+        self.pad_id = processor.tokenizer.pad_token_id
+        self.image_mean = torch.tensor(processor.image_processor.image_mean).view(1, 3, 1, 1)
+        self.image_std = torch.tensor(processor.image_processor.image_std).view(1, 3, 1, 1)
+        self.rescale_factor = processor.image_processor.rescale_factor
+        size = processor.image_processor.size
+        self.image_shape = (3, size["height"], size["width"])
+
+    def __call__(self, features: list) -> dict:
+        return self.expand({key: [feature[key] for feature in features] for key in features[0]})
+
+    def expand(self, batch: dict) -> dict:
+        ids = [torch.as_tensor(np.asarray(x), dtype=torch.long) for x in batch["input_ids"]]
+        n, seq_len = len(ids), max(len(x) for x in ids)
+
+        input_ids = torch.full((n, seq_len), self.pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((n, seq_len), dtype=torch.long)
+        bbox = torch.zeros((n, seq_len, 4), dtype=torch.long)
+        for row, (row_ids, row_boxes) in enumerate(zip(ids, batch["bbox"])):
+            input_ids[row, :len(row_ids)] = row_ids
+            attention_mask[row, :len(row_ids)] = 1
+            bbox[row, :len(row_ids)] = torch.as_tensor(np.stack(row_boxes), dtype=torch.long)
+
+        pixels = torch.stack([torch.as_tensor(np.asarray(p)) for p in batch["pixel_values"]])
+
+        expanded = {"input_ids": input_ids, "attention_mask": attention_mask, "bbox": bbox,
+                    "pixel_values": self.normalize(pixels)}
+        for key, values in batch.items():
+            if key not in expanded:
+                stacked = torch.stack([torch.as_tensor(np.asarray(v)) for v in values])
+                # like the torch formatter, floating columns such as teacher_logits come out float32
+                expanded[key] = stacked.float() if stacked.is_floating_point() else stacked
+        return expanded
+
+    def normalize(self, pixels: torch.Tensor) -> torch.Tensor:
+        return (pixels.float() * self.rescale_factor - self.image_mean) / self.image_std
+
+    def expand_table(self, table) -> dict:
+        """Model inputs from a pyarrow table of compact rows, reading its buffers in place.
+
+        Token ids, boxes and pixels are numpy views of the Arrow buffers, which
+        for a table loaded with load_from_disk are the memory-mapped files; the
+        only copies are the padded int64 tensors and the normalized pixels.
+        """
+        ids_column = single_chunk(table.column("input_ids"))
+        offsets = ids_column.offsets.to_numpy()
+        lengths = torch.from_numpy(np.diff(offsets).astype(np.int64))
+        n, seq_len = len(ids_column), int(lengths.max())
+
+        with warnings.catch_warnings():
+            # the mapped buffers are read-only, they are only ever read from
+            warnings.simplefilter("ignore", UserWarning)
+            ids = torch.from_numpy(ids_column.flatten().to_numpy(zero_copy_only=True))
+            boxes = torch.from_numpy(
+                single_chunk(table.column("bbox")).flatten().flatten().to_numpy(zero_copy_only=True)
+            ).view(-1, 4)
+            # Array3D is an extension type over three levels of lists
+            pixel_column = single_chunk(table.column("pixel_values"))
+            pixel_column = getattr(pixel_column, "storage", pixel_column)
+            pixel_values = pixel_column.flatten().flatten().flatten().to_numpy(zero_copy_only=True)
+            pixels = torch.from_numpy(pixel_values).view(n, *self.image_shape)
+
+        # row-major positions below each row's length, in the order the flattened values are stored
+        attention_mask = (torch.arange(seq_len).unsqueeze(0) < lengths.unsqueeze(1)).long()
+        input_ids = torch.full((n, seq_len), self.pad_id, dtype=torch.long)
+        input_ids[attention_mask.bool()] = ids.long()
+        bbox = torch.zeros((n, seq_len, 4), dtype=torch.long)
+        bbox[attention_mask.bool()] = boxes.long()
+
+        expanded = {"input_ids": input_ids, "attention_mask": attention_mask, "bbox": bbox,
+                    "pixel_values": self.normalize(pixels)}
+        for key in table.column_names:
+            if key not in expanded:
+                values = table.column(key).to_numpy(zero_copy_only=False)
+                stacked = torch.as_tensor(np.stack(values) if values.dtype == object else values)
+                expanded[key] = stacked.float() if stacked.is_floating_point() else stacked
+        return expanded
@@ -0,0 +1,78 @@
+import torch
+import pyarrow.compute as pc
+from torch.utils.data import DataLoader, Dataset, BatchSampler, RandomSampler, SequentialSampler
+from datasets import load_from_disk
+from src.DocumindAI.utils.compact_encoding import CompactCollator
+
+
+class MappedSplit(Dataset):
+    """An encoded split read straight from its memory-mapped Arrow files, indexed by whole batches.
+
+    `split[rows]` returns the model inputs of those rows. A run of consecutive
+    rows is a zero-copy slice of the mapping, any other set of rows is gathered
+    with a single Arrow take, never through Python lists. Each DataLoader worker
+    maps the files itself, the pages are shared through the page cache.
+    """
+    def __init__(self, path: str, collator: CompactCollator):
+        self.path = path
+        self.collator = collator
+        self._table = None
+        self._num_rows = load_from_disk(path).num_rows
+
+    def __getstate__(self):
+        # workers map the files again instead of receiving a pickled table
+        return {**self.__dict__, "_table": None}
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = load_from_disk(self.path).data.table
+        return self._table
+
+    def lengths(self) -> list:
+        """token count of every row, from the Arrow list offsets"""
+        return pc.list_value_length(self.table.column("input_ids")).to_pylist()
+
+    def __len__(self) -> int:
+        return self._num_rows
+
+    def __getitem__(self, rows: list) -> dict:
+        rows = list(rows)
+        if rows == list(range(rows[0], rows[0] + len(rows))):
+            batch = self.table.slice(rows[0], len(rows))
+        else:
+            batch = self.table.take(rows)
+        return self.collator.expand_table(batch)
+
+
+def mapped_loader(split: MappedSplit, batch_size: int = None, batches: list = None, shuffle: bool = False,
+                  num_workers: int = 0, prefetch_factor: int = 2, seed: int = 42) -> DataLoader:
+    """DataLoader over a MappedSplit whose workers build and prefetch whole batches
+
+    Args:
+        split (MappedSplit): memory-mapped encoded split
+        batch_size (int): rows per batch when batches is not given
+        batches (list): explicit row lists, one per batch, served in this order
+        shuffle (bool): reshuffle the rows every epoch
+        num_workers (int): worker processes, 0 builds batches in the calling process
+        prefetch_factor (int): batches each worker prepares ahead
+        seed (int): seed of the shuffle
+
+    Returns:
+        DataLoader: yields padded, normalized model inputs
+    """
+    if batches is None:
+        generator = torch.Generator().manual_seed(seed)
+        rows = RandomSampler(split, generator=generator) if shuffle else SequentialSampler(split)
+        batches = BatchSampler(rows, batch_size, drop_last=False)
+
+    # the sampler hands out whole batches, batch_size=None turns off the DataLoader's own batching
+    return DataLoader(
+        split,
+        sampler=batches,
+        batch_size=None,
+        num_workers=num_workers,
+        prefetch_factor=prefetch_factor if num_workers else None,
+        persistent_workers=num_workers > 0,
+        pin_memory=torch.cuda.is_available(),
+    )
@@ -0,0 +1,70 @@
+import os
+import json
+import struct
+import torch
+from transformers import AutoConfig, LayoutLMv3ForSequenceClassification
+from transformers.modeling_utils import no_init_weights
+from src.DocumindAI.logging import logger
+
+
+SAFETENSORS_FILE = "model.safetensors"
+
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+    "U8": torch.uint8, "BOOL": torch.bool,
+}
+
+
+def load_mmap_state_dict(path: str) -> dict:
+    """state dict whose tensors are views into a private memory map of a safetensors file
+
+    The mapping is copy-on-write, so as long as nobody writes to the weights
+    every process on the node reads the same physical pages from the page cache.
+
+    Args:
+        path (str): path to a .safetensors file
+
+    Returns:
+        dict: parameter name -> tensor
+    """
+    with open(path, "rb") as f:
+        header_len = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_len))
+    header.pop("__metadata__", None)
+
+    storage = torch.UntypedStorage.from_file(str(path), shared=False, nbytes=os.path.getsize(path))
+    flat = torch.empty(0, dtype=torch.uint8).set_(storage)
+    data_start = 8 + header_len
+
+    state_dict = {}
+    for name, info in header.items():
+        begin, end = info["data_offsets"]
+        raw = flat[data_start + begin:data_start + end]
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        try:
+            tensor = raw.view(dtype)
+        except RuntimeError:
+            # misaligned for this dtype, fall back to a private copy
+            tensor = raw.clone().view(dtype)
+        state_dict[name] = tensor.view(info["shape"])
+
+    return state_dict
+
+
+def load_mmap_model(model_dir: str):
+    """LayoutLMv3 classifier whose weights are memory-mapped from model.safetensors"""
+    config = AutoConfig.from_pretrained(model_dir)
+    with no_init_weights():
+        model = LayoutLMv3ForSequenceClassification(config)
+
+    state_dict = load_mmap_state_dict(os.path.join(model_dir, SAFETENSORS_FILE))
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    if missing:
+        # no_init_weights left those parameters uninitialized, serving them would give garbage
+        raise KeyError(f"{SAFETENSORS_FILE} in {model_dir} is missing weights: {missing}")
+    if unexpected:
+        logger.warning(f"mmap load: ignoring unexpected keys {unexpected}")
+
+    model.eval()
+    return model
@@ -0,0 +1,53 @@
+import torch
+
+# padding value per model input, everything not listed is padded with the tokenizer pad id
+PAD_VALUES = {"attention_mask": 0, "bbox": 0}
+SEQUENCE_KEYS = ("input_ids", "attention_mask", "bbox")
+
+
+def length_bucket(length: int, buckets: list) -> int:
+    """smallest configured bucket that fits `length`
+
+    Args:
+        length (int): number of tokens in the sequence
+        buckets (list): ascending bucket boundaries
+
+    Returns:
+        int: bucket boundary, or the last bucket if the sequence is longer
+    """
+    for bucket in buckets:
+        if length <= bucket:
+            return bucket
+    return buckets[-1]
+
+
+def pad_encodings(encodings: list, pad_id: int) -> dict:
+    """pads every sequence input to the longest one in the batch and stacks them
+
+    Args:
+        encodings (list): processor outputs with a leading batch dimension
+        pad_id (int): tokenizer pad token id used for input_ids
+
+    Returns:
+        dict: batched model inputs
+    """
+    seq_len = max(encoding["input_ids"].shape[1] for encoding in encodings)
+
+    batch = {}
+    for key in encodings[0]:
+        if key not in SEQUENCE_KEYS:
+            batch[key] = torch.cat([encoding[key] for encoding in encodings])
+            continue
+
+        pad_value = PAD_VALUES.get(key, pad_id)
+        padded = []
+        for encoding in encodings:
+            tensor = encoding[key]
+            missing = seq_len - tensor.shape[1]
+            if missing > 0:
+                pad_shape = (tensor.shape[0], missing) + tuple(tensor.shape[2:])
+                tensor = torch.cat([tensor, torch.full(pad_shape, pad_value, dtype=tensor.dtype)], dim=1)
+            padded.append(tensor)
+        batch[key] = torch.cat(padded)
+
+    return batch
@@ -0,0 +1,128 @@
+import io
+import numpy as np
+from types import SimpleNamespace
+import pytest
+import torch
+from PIL import Image, ImageDraw
+from datasets import Dataset, Value
+from src.DocumindAI.constants import APP_CONFIG_FILE_PATH
+from src.DocumindAI.utils.common import read_yaml
+from src.DocumindAI.entity.config_entity import BatchingConfig, PageFilterConfig, PredictionCacheConfig
+from src.DocumindAI.utils.compact_encoding import compact_features
+
+
+PAD_ID = 1
+IMAGE_SIZE = 8
+
+
+@pytest.fixture
+def processor():
+    """The parts of a LayoutLMv3 processor the collators and the batcher read."""
+    return SimpleNamespace(
+        tokenizer=SimpleNamespace(pad_token_id=PAD_ID),
+        image_processor=SimpleNamespace(
+            image_mean=[0.5, 0.5, 0.5], image_std=[0.5, 0.5, 0.5], rescale_factor=1 / 255,
+            size={"height": IMAGE_SIZE, "width": IMAGE_SIZE}
+        ),
+    )
+
+
+class FakeRegistry:
+    """Stands in for ModelRegistry, each row's logit is the sum of its unpadded input ids."""
+    def __init__(self, processor):
+        self.processor = processor
+        self.batches = []
+
+    def get(self):
+        return SimpleNamespace(processor=self.processor)
+
+    def forward(self, inputs: dict):
+        self.batches.append(inputs)
+        ids = inputs["input_ids"].masked_fill(inputs["attention_mask"] == 0, 0)
+        return ids.sum(dim=1, keepdim=True).float()
+
+
+@pytest.fixture
+def registry(processor):
+    return FakeRegistry(processor)
+
+
+@pytest.fixture
+def make_encoding():
+    """Factory of single-page processor outputs, every input id set to value."""
+    def make(length: int, value: int = 2) -> dict:
+        return {
+            "input_ids": torch.full((1, length), value, dtype=torch.long),
+            "attention_mask": torch.ones((1, length), dtype=torch.long),
+            "bbox": torch.full((1, length, 4), 7, dtype=torch.long),
+            "pixel_values": torch.ones((1, 3, IMAGE_SIZE, IMAGE_SIZE)),
+        }
+    return make
+
+
+@pytest.fixture
+def make_batching_config():
+    def make(**overrides) -> BatchingConfig:
+        settings = {"max_batch_size": 8, "max_wait_ms": 50, "max_queue_size": 64, "length_buckets": [64, 128, 512]}
+        return BatchingConfig(**{**settings, **overrides})
+    return make
+
+
+@pytest.fixture
+def make_cache_config(tmp_path):
+    def make(max_entries: int = 8, disk_enabled: bool = False) -> PredictionCacheConfig:
+        return PredictionCacheConfig(max_entries=max_entries, disk_enabled=disk_enabled,
+                                     disk_dir=tmp_path / "prediction_cache", disk_size_limit_mb=16)
+    return make
+
+
+@pytest.fixture
+def make_page_filter_config():
+    """The page-filter thresholds shipped in config/app_config.yaml."""
+    def make(**overrides) -> PageFilterConfig:
+        shipped = read_yaml(APP_CONFIG_FILE_PATH).serving.page_filter
+        return PageFilterConfig(**{**shipped, **overrides})
+    return make
+
+
+@pytest.fixture
+def text_page() -> Image.Image:
+    page = Image.new("RGB", (850, 1100), "white")
+    draw = ImageDraw.Draw(page)
+    for top in range(100, 1000, 40):
+        draw.rectangle((80, top, 770, top + 12), fill="black")
+    return page
+
+
+@pytest.fixture
+def blank_page() -> Image.Image:
+    return Image.new("RGB", (850, 1100), "white")
+
+
+@pytest.fixture
+def tiff_bytes():
+    """Factory of TIFF files whose frames are flat grey levels 0, 1, 2, ..."""
+    def make(frames: int) -> bytes:
+        images = [Image.new("RGB", (32, 32), color=(value, value, value)) for value in range(frames)]
+        buffer = io.BytesIO()
+        images[0].save(buffer, format="TIFF", save_all=True, append_images=images[1:])
+        return buffer.getvalue()
+    return make
+
+
+@pytest.fixture
+def compact_split(tmp_path, processor) -> str:
+    """A compact encoded split of 10 rows of varying lengths saved as two Arrow files, labels are the row numbers."""
+    rng = np.random.default_rng(0)
+    lengths = [3 + (row * 5) % 11 for row in range(10)]
+    features = compact_features(processor.image_processor.size)
+    features["labels"] = Value("int64")
+    split = Dataset.from_dict({
+        "input_ids": [rng.integers(3, 1000, length).tolist() for length in lengths],
+        "bbox": [rng.integers(0, 1001, (length, 4)).tolist() for length in lengths],
+        "pixel_values": [rng.integers(0, 256, (3, IMAGE_SIZE, IMAGE_SIZE)).tolist() for _ in lengths],
+        "labels": list(range(len(lengths))),
+    }, features=features)
+    path = str(tmp_path / "split")
+    split.save_to_disk(path, num_shards=2)
+    return path
@@ -0,0 +1,80 @@
+from src.DocumindAI.components.batching_engine import BatchRequest, MicroBatcher
+
+
+def test_queued_requests_share_one_forward_pass(registry, make_batching_config, make_encoding):
+    batcher = MicroBatcher(registry, make_batching_config())
+    futures = [batcher.submit(make_encoding(10, value)) for value in (1, 2, 3)]
+
+    batcher.start()
+    try:
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.stop()
+
+    assert len(registry.batches) == 1
+    assert [float(result) for result in results] == [10.0, 20.0, 30.0]
+
+
+def test_cancelled_request_is_skipped(registry, make_batching_config, make_encoding):
+    batcher = MicroBatcher(registry, make_batching_config())
+    cancelled, waiting = BatchRequest(make_encoding(10)), BatchRequest(make_encoding(10, value=3))
+    cancelled.future.cancel()
+
+    batcher._process([cancelled, waiting])
+
+    assert cancelled.future.cancelled()
+    assert registry.batches[0]["input_ids"].shape[0] == 1
+    assert float(waiting.future.result()) == 30.0
+
+
+def test_batcher_keeps_serving_after_a_cancelled_request(registry, make_batching_config, make_encoding):
+    batcher = MicroBatcher(registry, make_batching_config())
+    batcher.submit(make_encoding(10)).cancel()
+    batcher.start()
+    try:
+        assert float(batcher.submit(make_encoding(10)).result(timeout=5)) == 20.0
+        assert batcher._thread.is_alive()
+    finally:
+        batcher.stop()
+
+
+def test_forward_failure_is_set_on_every_waiting_future(registry, make_batching_config, make_encoding):
+    registry.forward = lambda inputs: (_ for _ in ()).throw(RuntimeError("out of memory"))
+    batcher = MicroBatcher(registry, make_batching_config())
+    requests = [BatchRequest(make_encoding(10)), BatchRequest(make_encoding(10))]
+
+    batcher._process(requests)
+
+    for request in requests:
+        assert isinstance(request.future.exception(), RuntimeError)
+
+
+def test_batch_is_padded_to_its_longest_sequence(registry, make_batching_config, make_encoding):
+    batcher = MicroBatcher(registry, make_batching_config())
+    requests = [BatchRequest(make_encoding(10)), BatchRequest(make_encoding(30))]
+
+    batcher._process(requests)
+
+    inputs = registry.batches[0]
+    pad_id = registry.processor.tokenizer.pad_token_id
+    assert inputs["input_ids"].shape == (2, 30)
+    assert inputs["attention_mask"][0].tolist() == [1] * 10 + [0] * 20
+    assert (inputs["input_ids"][0, 10:] == pad_id).all()
+    assert [float(request.future.result()) for request in requests] == [20.0, 60.0]
+
+
+def test_requests_are_split_into_length_buckets(registry, make_batching_config, make_encoding):
+    batcher = MicroBatcher(registry, make_batching_config())
+    requests = [BatchRequest(make_encoding(length)) for length in (300, 20, 100, 60)]
+
+    buckets = batcher._split_by_length(requests)
+
+    lengths = [[request.inputs["input_ids"].shape[1] for request in bucket] for bucket in buckets]
+    assert lengths == [[20, 60], [100], [300]]
+
+
+def test_longer_than_every_bucket_goes_in_the_last_one(registry, make_batching_config, make_encoding):
+    batcher = MicroBatcher(registry, make_batching_config(length_buckets=[64, 128]))
+    requests = [BatchRequest(make_encoding(100)), BatchRequest(make_encoding(700))]
+
+    assert batcher._split_by_length(requests) == [requests]
@@ -0,0 +1,42 @@
+import pytest
+import torch
+from datasets import load_from_disk
+from src.DocumindAI.utils.compact_encoding import CompactCollator, sequence_lengths
+
+
+ROWS = {
+    "contiguous": [0, 1, 2, 3],
+    "spanning-shards": [3, 4, 5, 6],
+    "non-contiguous": [9, 0, 4, 7],
+    "repeated": [2, 2, 8],
+}
+
+
+@pytest.mark.parametrize("rows", ROWS.values(), ids=ROWS.keys())
+def test_expand_table_matches_expand(compact_split, processor, rows):
+    dataset, collator = load_from_disk(compact_split), CompactCollator(processor)
+    table = dataset.data.table
+    assert table.column("input_ids").num_chunks == 2
+
+    if rows == list(range(rows[0], rows[0] + len(rows))):
+        batch = table.slice(rows[0], len(rows))
+    else:
+        batch = table.take(rows)
+    from_table, from_rows = collator.expand_table(batch), collator.expand(dataset[rows])
+
+    assert from_table.keys() == from_rows.keys()
+    for key, expected in from_rows.items():
+        assert from_table[key].dtype == expected.dtype, key
+        assert torch.equal(from_table[key], expected), key
+    assert from_table["labels"].tolist() == rows
+
+
+def test_collator_pads_to_the_longest_row(compact_split, processor):
+    dataset = load_from_disk(compact_split)
+    lengths = sequence_lengths(dataset)
+
+    batch = CompactCollator(processor)([dataset[row] for row in (0, 1)])
+
+    assert batch["input_ids"].shape == (2, max(lengths[0], lengths[1]))
+    assert batch["attention_mask"].sum(dim=1).tolist() == lengths[:2]
+    assert (batch["input_ids"][batch["attention_mask"] == 0] == processor.tokenizer.pad_token_id).all()
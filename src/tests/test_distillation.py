@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+import pytest
+import torch
+from transformers import LayoutLMv3Config, LayoutLMv3ForSequenceClassification
+from src.DocumindAI.constants import PARAMS_FILE_PATH
+from src.DocumindAI.utils.common import read_yaml
+from src.DocumindAI.components.distillation import Distillation
+
+
+def build_student(**overrides) -> Distillation:
+    params = read_yaml(PARAMS_FILE_PATH)
+    # only initialize_student runs, the processor and dataset Distillation.__init__ loads are not needed
+    distillation = object.__new__(Distillation)
+    distillation.config = SimpleNamespace(**{**params.distillation, **overrides})
+    distillation.teacher = LayoutLMv3ForSequenceClassification(
+        LayoutLMv3Config(num_labels=params.TrainingArguments.num_labels)
+    ).eval()
+    distillation.initialize_student()
+    return distillation
+
+
+def forward(model) -> torch.Tensor:
+    seq_len, size = 16, model.config.input_size
+    with torch.no_grad():
+        return model(
+            input_ids=torch.randint(3, 1000, (1, seq_len)),
+            bbox=torch.tensor([[0, 0, 100, 50]]).repeat(1, seq_len, 1),
+            attention_mask=torch.ones((1, seq_len), dtype=torch.long),
+            pixel_values=torch.zeros((1, 3, size, size)),
+        ).logits
+
+
+@pytest.mark.parametrize("overrides", [{}, {"hidden_size": 768}], ids=["params.yaml", "teacher-width"])
+def test_student_runs_a_forward_pass(overrides):
+    distillation = build_student(**overrides)
+    student = distillation.student.eval()
+
+    assert student.config.num_hidden_layers == distillation.config.num_hidden_layers
+    assert forward(student).shape == (1, distillation.teacher.config.num_labels)
+
+
+def test_teacher_width_student_starts_from_the_teacher_layers():
+    distillation = build_student(hidden_size=768)
+    teacher, student = distillation.teacher.state_dict(), distillation.student.state_dict()
+
+    embeddings = "layoutlmv3.embeddings.word_embeddings.weight"
+    assert torch.equal(student[embeddings], teacher[embeddings])
+    # the last student layer is the teacher's last, the feed-forward output is narrower and not copied
+    last = distillation.config.num_hidden_layers - 1
+    query = "layoutlmv3.encoder.layer.{}.attention.self.query.weight"
+    assert torch.equal(student[query.format(last)], teacher[query.format(11)])
@@ -0,0 +1,55 @@
+import io
+from PIL import Image
+from src.DocumindAI.components.page_filter import BLANK_PAGE, NON_DOCUMENT
+from src.DocumindAI.components.document_pages import aggregate, is_multipage, tiff_pages
+
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_aggregate_is_a_confidence_weighted_vote():
+    pages = [
+        {"page": 1, "label": "invoice", "confidence": 0.9},
+        {"page": 2, "label": "letter", "confidence": 0.6},
+        {"page": 3, "label": "invoice", "confidence": 0.5},
+    ]
+
+    assert aggregate(pages) == {"label": "invoice", "confidence": (0.9 + 0.5) / 3}
+
+
+def test_aggregate_ignores_blank_and_non_document_pages():
+    pages = [
+        {"page": 1, "label": BLANK_PAGE, "confidence": 1.0},
+        {"page": 2, "label": "letter", "confidence": 0.8},
+        {"page": 3, "label": NON_DOCUMENT, "confidence": 1.0},
+        {"page": 4, "label": BLANK_PAGE, "confidence": 1.0},
+    ]
+
+    assert aggregate(pages) == {"label": "letter", "confidence": 0.8}
+
+
+def test_aggregate_of_only_rejected_pages_is_their_most_common_label():
+    pages = [
+        {"page": 1, "label": BLANK_PAGE, "confidence": 1.0},
+        {"page": 2, "label": NON_DOCUMENT, "confidence": 1.0},
+        {"page": 3, "label": BLANK_PAGE, "confidence": 1.0},
+    ]
+
+    assert aggregate(pages) == {"label": BLANK_PAGE, "confidence": 1.0}
+
+
+def test_only_pdfs_and_multi_frame_tiffs_are_multipage(tiff_bytes):
+    assert is_multipage(b"%PDF-1.7\n")
+    assert is_multipage(tiff_bytes(3))
+    assert not is_multipage(tiff_bytes(1))
+    assert not is_multipage(png_bytes())
+
+
+def test_tiff_pages_yields_every_frame_in_order(tiff_bytes):
+    pages = list(tiff_pages(tiff_bytes(3)))
+
+    assert [page.number for page in pages] == [1, 2, 3]
+    assert [page.image.getpixel((0, 0)) for page in pages] == [(0, 0, 0), (1, 1, 1), (2, 2, 2)]
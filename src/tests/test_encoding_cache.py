@@ -0,0 +1,77 @@
+from datasets import Dataset
+from src.DocumindAI.components.encoding_cache import EncodingCache, image_fingerprint, FINGERPRINT_COLUMN
+
+
+def encoded(fingerprints: list, values: list) -> Dataset:
+    return Dataset.from_dict({FINGERPRINT_COLUMN: fingerprints, "value": values})
+
+
+def test_fingerprint_changes_with_the_image_and_the_settings(tmp_path):
+    path = tmp_path / "page.png"
+    path.write_bytes(b"first scan")
+    before = image_fingerprint({"image_path": [str(path)]}, "max_length=512")[FINGERPRINT_COLUMN][0]
+
+    assert image_fingerprint({"image_path": [str(path)]}, "max_length=512")[FINGERPRINT_COLUMN][0] == before
+    assert image_fingerprint({"image_path": [str(path)]}, "max_length=256")[FINGERPRINT_COLUMN][0] != before
+
+    path.write_bytes(b"second scan")
+    assert image_fingerprint({"image_path": [str(path)]}, "max_length=512")[FINGERPRINT_COLUMN][0] != before
+
+
+def test_only_unseen_fingerprints_are_encoded_once(tmp_path):
+    cache = EncodingCache(str(tmp_path))
+    cache.add(encoded(["a", "b"], [1, 2]))
+
+    assert cache.missing(["a", "c", "b", "c", "d"]) == [1, 4]
+
+
+def test_rows_are_reused_by_the_next_run(tmp_path):
+    EncodingCache(str(tmp_path)).add(encoded(["a", "b"], [1, 2]))
+    cache = EncodingCache(str(tmp_path))
+    cache.add(encoded(["c"], [3]))
+
+    assembled = cache.assemble(["c", "a", "b", "a"])
+
+    assert assembled["value"] == [3, 1, 2, 1]
+    assert FINGERPRINT_COLUMN not in assembled.column_names
+
+
+def test_extra_columns_follow_the_rows_without_writing_into_the_cache(tmp_path):
+    cache = EncodingCache(str(tmp_path))
+    cache.add(encoded(["a", "b"], [1, 2]))
+    cache.add(encoded(["c"], [3]))
+
+    assembled = cache.assemble(["c", "a", "b"], columns={"labels": [30, 10, 20]})
+
+    assert assembled["value"] == [3, 1, 2]
+    assert assembled["labels"] == [30, 10, 20]
+    assert not list(tmp_path.glob("shard-*/cache-*.arrow"))
+
+
+def test_changed_settings_invalidate_the_cached_rows(tmp_path):
+    # new settings give every image a new fingerprint, so nothing cached matches anymore
+    cache = EncodingCache(str(tmp_path))
+    cache.add(encoded(["a@512", "b@512"], [1, 2]))
+
+    assert cache.missing(["a@256", "b@256"]) == [0, 1]
+
+
+def test_prune_drops_shards_no_split_uses(tmp_path):
+    cache = EncodingCache(str(tmp_path))
+    cache.add(encoded(["a", "b"], [1, 2]))
+    cache.add(encoded(["c"], [3]))
+
+    cache.prune(["c"])
+
+    assert sorted(cache.shards) == ["shard-00001"]
+    assert cache.missing(["a", "c"]) == [0]
+    assert not (tmp_path / "shard-00000").exists()
+
+
+def test_interrupted_shard_is_discarded(tmp_path):
+    (tmp_path / "shard-00000.tmp").mkdir()
+
+    cache = EncodingCache(str(tmp_path))
+
+    assert cache.shards == {}
+    assert not (tmp_path / "shard-00000.tmp").exists()
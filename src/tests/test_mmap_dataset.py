@@ -0,0 +1,52 @@
+import pytest
+import torch
+from datasets import load_from_disk
+from src.DocumindAI.utils.compact_encoding import CompactCollator, sequence_lengths
+from src.DocumindAI.utils.mmap_dataset import MappedSplit, mapped_loader
+
+
+def test_split_reads_batches_like_the_collator(compact_split, processor):
+    collator = CompactCollator(processor)
+    split, dataset = MappedSplit(compact_split, collator), load_from_disk(compact_split)
+
+    assert len(split) == 10
+    assert split.lengths() == sequence_lengths(dataset)
+    for rows in ([2, 3, 4, 5], [8, 1, 5]):
+        batch, expected = split[rows], collator.expand(dataset[rows])
+        for key in expected:
+            assert torch.equal(batch[key], expected[key]), key
+
+
+def test_pickled_split_maps_the_files_again(compact_split, processor):
+    split = MappedSplit(compact_split, CompactCollator(processor))
+    split[[0, 1]]
+
+    assert split.__getstate__()["_table"] is None
+    assert split._table is not None
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_loader_serves_every_row_in_order(compact_split, processor, num_workers):
+    split = MappedSplit(compact_split, CompactCollator(processor))
+
+    batches = list(mapped_loader(split, batch_size=4, num_workers=num_workers))
+
+    assert [batch["labels"].tolist() for batch in batches] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_loader_serves_explicit_batches_in_their_order(compact_split, processor):
+    split = MappedSplit(compact_split, CompactCollator(processor))
+
+    batches = mapped_loader(split, batches=[[7, 2], [0, 9, 4]], num_workers=2)
+
+    assert [batch["labels"].tolist() for batch in batches] == [[7, 2], [0, 9, 4]]
+
+
+def test_shuffled_loader_is_seeded(compact_split, processor):
+    split = MappedSplit(compact_split, CompactCollator(processor))
+
+    def epoch(seed):
+        return [row for batch in mapped_loader(split, batch_size=4, shuffle=True, seed=seed) for row in batch["labels"].tolist()]
+
+    assert epoch(1) == epoch(1)
+    assert sorted(epoch(1)) == list(range(10))
@@ -0,0 +1,38 @@
+import torch
+from safetensors.torch import load_file
+from transformers import LayoutLMv3Config, LayoutLMv3ForSequenceClassification
+from src.DocumindAI.utils.mmap_weights import load_mmap_model, load_mmap_state_dict, SAFETENSORS_FILE
+
+
+def save_tiny_model(model_dir) -> None:
+    config = LayoutLMv3Config(
+        hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64,
+        input_size=32, num_labels=3
+    )
+    LayoutLMv3ForSequenceClassification(config).save_pretrained(model_dir, safe_serialization=True)
+
+
+def test_mapped_tensors_match_the_file(tmp_path):
+    save_tiny_model(tmp_path)
+
+    mapped, loaded = load_mmap_state_dict(tmp_path / SAFETENSORS_FILE), load_file(tmp_path / SAFETENSORS_FILE)
+
+    assert mapped.keys() == loaded.keys()
+    for name, tensor in loaded.items():
+        assert mapped[name].dtype == tensor.dtype
+        assert torch.equal(mapped[name], tensor), name
+
+
+def test_mapped_model_predicts_like_a_normal_load(tmp_path):
+    save_tiny_model(tmp_path)
+    mapped, loaded = load_mmap_model(str(tmp_path)), LayoutLMv3ForSequenceClassification.from_pretrained(tmp_path).eval()
+    seq_len = 8
+    inputs = {
+        "input_ids": torch.randint(3, 100, (2, seq_len)),
+        "bbox": torch.tensor([[0, 0, 100, 50]]).repeat(2, seq_len, 1),
+        "attention_mask": torch.ones((2, seq_len), dtype=torch.long),
+        "pixel_values": torch.rand((2, 3, 32, 32)),
+    }
+
+    with torch.no_grad():
+        assert torch.equal(mapped(**inputs).logits, loaded(**inputs).logits)
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from src.DocumindAI.entity.config_entity import ModelPoolConfig
+from src.DocumindAI.components.model_registry import LoadedModel
+from src.DocumindAI.components.model_quantization import QUANTIZED_WEIGHTS_FILE
+from src.DocumindAI.components.model_pool import ModelPool, UnknownModelVersion, VersionNotPromoted
+from src.DocumindAI.utils.common import get_weights_fingerprint
+
+
+MB = 2**20
+
+
+class FakeRegistry:
+    """Stands in for ModelRegistry, every built model answers with the name of its directory."""
+    def __init__(self, tmp_path):
+        self.config = SimpleNamespace(promotion_file=tmp_path / "promotion.json")
+        self.built = []
+
+    def build(self, model_dir: str, version: str) -> LoadedModel:
+        self.built.append(Path(model_dir).name)
+        label = Path(model_dir).name
+        return LoadedModel(processor=None, backend=lambda encoding: [label], id2label={}, version=version)
+
+    def warm(self, loaded: LoadedModel):
+        pass
+
+    def encode(self, image, words: list, boxes: list, loaded: LoadedModel):
+        return {"words": words}
+
+    def decode(self, output, loaded: LoadedModel):
+        return output, 1.0
+
+
+def model_dir(tmp_path, name: str, size_mb: int = 1, weights: str = "model.safetensors") -> str:
+    path = tmp_path / name
+    path.mkdir()
+    (path / weights).write_bytes(name.encode() * (size_mb * MB // len(name)))
+    return str(path)
+
+
+def make_pool(tmp_path, versions: dict, memory_budget_mb: int = 64) -> ModelPool:
+    config = ModelPoolConfig(versions=versions, memory_budget_mb=memory_budget_mb, pinned_workers=2,
+                             shadow_version=None, shadow_sample_fraction=0.0)
+    return ModelPool(FakeRegistry(tmp_path), config)
+
+
+def test_pinned_requests_run_on_their_own_version(tmp_path):
+    pool = make_pool(tmp_path, {"v1": model_dir(tmp_path, "v1"), "v2": model_dir(tmp_path, "v2")})
+    try:
+        assert pool.submit("v2", None, ["Invoice"], [[0, 0, 1, 1]]).result(timeout=5) == ("v2", 1.0)
+        assert pool.submit("v1", None, ["Invoice"], [[0, 0, 1, 1]]).result(timeout=5) == ("v1", 1.0)
+    finally:
+        pool.shutdown()
+
+
+def test_loaded_version_is_reused(tmp_path):
+    pool = make_pool(tmp_path, {"v1": model_dir(tmp_path, "v1")})
+
+    assert pool.get("v1") is pool.get("v1")
+    assert pool.registry.built == ["v1"]
+
+
+def test_unknown_version_is_refused(tmp_path):
+    with pytest.raises(UnknownModelVersion):
+        make_pool(tmp_path, {}).get("v9")
+
+
+def test_least_recently_used_version_is_evicted_over_the_budget(tmp_path):
+    versions = {name: model_dir(tmp_path, name, size_mb=2) for name in ("v1", "v2", "v3")}
+    pool = make_pool(tmp_path, versions, memory_budget_mb=5)
+
+    pool.get("v1")
+    pool.get("v2")
+    pool.get("v1")
+    pool.get("v3")
+
+    assert list(pool._models) == ["v1", "v3"]
+    pool.get("v2")
+    assert pool.registry.built == ["v1", "v2", "v3", "v2"]
+
+
+def test_version_over_the_budget_on_its_own_is_still_served(tmp_path):
+    pool = make_pool(tmp_path, {"v1": model_dir(tmp_path, "v1"), "big": model_dir(tmp_path, "big", size_mb=4)},
+                     memory_budget_mb=2)
+
+    pool.get("v1")
+    pool.get("big")
+
+    assert list(pool._models) == ["big"]
+
+
+def test_int8_version_needs_a_promotion(tmp_path):
+    int8 = model_dir(tmp_path, "int8", weights=QUANTIZED_WEIGHTS_FILE)
+    pool = make_pool(tmp_path, {"int8": int8})
+
+    with pytest.raises(VersionNotPromoted):
+        pool.get("int8")
+
+    pool.registry.config.promotion_file.write_text(
+        json.dumps({"promoted": True, "model_version": get_weights_fingerprint(Path(int8))})
+    )
+    pool.refresh()
+    assert pool.get("int8").version.startswith("int8:")
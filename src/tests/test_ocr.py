@@ -0,0 +1,48 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.DocumindAI.entity.config_entity import OCRConfig
+from src.DocumindAI.components import ocr
+from src.DocumindAI.components.ocr import OCREngine
+
+
+def make_engine(tmp_path) -> OCREngine:
+    return OCREngine(OCRConfig(cache_dir=tmp_path / "ocr_cache", lang=None, tesseract_config=""))
+
+
+def test_stored_result_is_looked_up_again(tmp_path):
+    engine = make_engine(tmp_path)
+    key = engine.key(b"scan")
+
+    engine.store(key, ["Invoice", "Total"], [[10, 20, 110, 40], [10, 60, 90, 80]])
+
+    assert make_engine(tmp_path).lookup(key) == (["Invoice", "Total"], [[10, 20, 110, 40], [10, 60, 90, 80]])
+    assert engine.lookup(engine.key(b"another scan")) is None
+
+
+def test_key_changes_with_the_ocr_settings(tmp_path):
+    engine = make_engine(tmp_path)
+    german = OCREngine(OCRConfig(cache_dir=tmp_path / "ocr_cache", lang="deu", tesseract_config=""))
+
+    assert engine.key(b"scan") != german.key(b"scan")
+
+
+def test_concurrent_writes_use_their_own_temp_files(tmp_path, monkeypatch):
+    engine, writers = make_engine(tmp_path), 4
+    key = engine.key(b"scan")
+    # hold every writer at the rename so all temp files exist at the same time
+    barrier, sources, replace = threading.Barrier(writers), [], os.replace
+
+    def held_replace(src, dst):
+        sources.append(src)
+        barrier.wait(timeout=5)
+        replace(src, dst)
+
+    monkeypatch.setattr(ocr.os, "replace", held_replace)
+    with ThreadPoolExecutor(writers) as pool:
+        list(pool.map(lambda word: engine.store(key, [word], [[0, 0, 1, 1]]), ["a", "b", "c", "d"]))
+
+    words, _ = engine.lookup(key)
+    assert len(set(sources)) == writers
+    assert words[0] in {"a", "b", "c", "d"}
+    assert not list((tmp_path / "ocr_cache").rglob("*.tmp"))
@@ -0,0 +1,34 @@
+import torch
+from src.DocumindAI.utils.padding import length_bucket, pad_encodings
+
+
+def test_length_bucket_is_the_smallest_that_fits():
+    assert length_bucket(10, [64, 128, 512]) == 64
+    assert length_bucket(64, [64, 128, 512]) == 64
+    assert length_bucket(65, [64, 128, 512]) == 128
+    assert length_bucket(900, [64, 128, 512]) == 512
+
+
+def test_pad_encodings_pads_to_the_longest_sequence(make_encoding):
+    batch = pad_encodings([make_encoding(3), make_encoding(5, value=3)], pad_id=1)
+
+    assert batch["input_ids"].tolist() == [[2, 2, 2, 1, 1], [3, 3, 3, 3, 3]]
+    assert batch["attention_mask"].tolist() == [[1, 1, 1, 0, 0], [1, 1, 1, 1, 1]]
+    assert batch["bbox"].shape == (2, 5, 4)
+    assert (batch["bbox"][0, 3:] == 0).all() and (batch["bbox"][0, :3] == 7).all()
+
+
+def test_pad_encodings_stacks_inputs_without_a_sequence_axis(make_encoding):
+    encodings = [make_encoding(3), make_encoding(5)]
+
+    batch = pad_encodings(encodings, pad_id=1)
+
+    assert batch["pixel_values"].shape == (2, *encodings[0]["pixel_values"].shape[1:])
+
+
+def test_pad_encodings_keeps_equal_lengths_as_they_are(make_encoding):
+    encodings = [make_encoding(4), make_encoding(4, value=3)]
+
+    batch = pad_encodings(encodings, pad_id=1)
+
+    assert torch.equal(batch["input_ids"], torch.cat([e["input_ids"] for e in encodings]))
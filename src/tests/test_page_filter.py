@@ -0,0 +1,64 @@
+import numpy as np
+from PIL import Image
+from src.DocumindAI.components.page_filter import PageFilter, BLANK_PAGE, NON_DOCUMENT, screen
+
+
+def photo() -> Image.Image:
+    pixels = np.random.default_rng(0).integers(0, 256, size=(600, 800, 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def test_text_page_is_accepted(make_page_filter_config, text_page):
+    assert PageFilter(make_page_filter_config()).check(text_page) is None
+
+
+def test_empty_sheet_is_blank(make_page_filter_config, blank_page):
+    assert PageFilter(make_page_filter_config()).check(blank_page) == BLANK_PAGE
+
+
+def test_colourful_photo_is_not_a_document(make_page_filter_config):
+    assert PageFilter(make_page_filter_config()).check(photo()) == NON_DOCUMENT
+
+
+def test_extreme_aspect_ratio_is_not_a_document(make_page_filter_config, text_page):
+    strip = text_page.resize((1700, 200))
+
+    assert PageFilter(make_page_filter_config()).check(strip) == NON_DOCUMENT
+
+
+def test_disabled_filter_accepts_everything(make_page_filter_config, blank_page):
+    page_filter = PageFilter(make_page_filter_config(enabled=False))
+
+    assert page_filter.check(blank_page) is None
+    assert page_filter.check(photo()) is None
+
+
+class FakeGate:
+    """Stands in for VisualGate, answers with a fixed (label, confidence) or None."""
+    def __init__(self, answer):
+        self.answer = answer
+        self.pages = 0
+
+    def classify(self, image):
+        self.pages += 1
+        return self.answer
+
+
+def test_screen_answers_rejected_pages_without_the_gate(make_page_filter_config, blank_page):
+    gate = FakeGate(("letter", 0.99))
+
+    assert screen(PageFilter(make_page_filter_config()), gate, blank_page) == {"label": BLANK_PAGE, "confidence": 1.0}
+    assert gate.pages == 0
+
+
+def test_screen_uses_a_confident_gate_answer(make_page_filter_config, text_page):
+    page_filter = PageFilter(make_page_filter_config())
+
+    assert screen(page_filter, FakeGate(("letter", 0.99)), text_page) == {"label": "letter", "confidence": 0.99}
+
+
+def test_screen_passes_pages_on_when_the_gate_is_unsure_or_off(make_page_filter_config, text_page):
+    page_filter = PageFilter(make_page_filter_config())
+
+    assert screen(page_filter, FakeGate(None), text_page) is None
+    assert screen(page_filter, None, text_page) is None
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from src.DocumindAI.components.prediction_cache import PredictionCache
+
+
+def test_key_changes_with_model_version_and_settings():
+    key = PredictionCache.make_key("digest", "v1", "settings")
+
+    assert key != PredictionCache.make_key("digest", "v2", "settings")
+    assert key != PredictionCache.make_key("digest", "v1", "retuned")
+
+
+def test_memory_tier_evicts_least_recently_used(make_cache_config):
+    cache = PredictionCache(make_cache_config(max_entries=2))
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_disk_tier_survives_a_restart(make_cache_config):
+    PredictionCache(make_cache_config(disk_enabled=True)).put("key", {"label": "invoice"})
+
+    assert PredictionCache(make_cache_config(disk_enabled=True)).get("key") == {"label": "invoice"}
+
+
+def test_concurrent_misses_compute_once(make_cache_config):
+    async def scenario():
+        cache = PredictionCache(make_cache_config())
+        release, calls = asyncio.Event(), []
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return {"label": "invoice"}
+
+        tasks = [asyncio.create_task(cache.get_or_compute("key", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks), calls
+
+    results, calls = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert results == [{"label": "invoice"}] * 3
+
+
+def test_cancelled_follower_does_not_fail_the_leader(make_cache_config):
+    async def scenario():
+        cache = PredictionCache(make_cache_config())
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return {"label": "invoice"}
+
+        leader = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_compute("key", compute))
+        other = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+
+        # a follower timing out must leave the shared future to the leader
+        follower.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader, await other, cache.get("key")
+
+    leader, other, cached = asyncio.run(scenario())
+
+    assert leader == other == cached == {"label": "invoice"}
+
+
+def test_followers_see_the_leaders_failure(make_cache_config):
+    async def scenario():
+        cache = PredictionCache(make_cache_config())
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            raise ValueError("unreadable image")
+
+        tasks = [asyncio.create_task(cache.get_or_compute("key", compute)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True), cache
+
+    results, cache = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.get("key") is None
+    assert not cache._inflight
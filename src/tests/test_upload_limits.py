@@ -0,0 +1,63 @@
+import io
+import pytest
+from fastapi import FastAPI, UploadFile, File
+from fastapi.testclient import TestClient
+from app import BodySizeLimit, UploadTooLarge, read_upload
+
+
+LIMIT = 1024
+
+
+@pytest.fixture
+def client():
+    limited = FastAPI()
+
+    @limited.post("/predict")
+    async def predict(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    limited.add_middleware(BodySizeLimit, limits={"/predict": LIMIT})
+    return TestClient(limited)
+
+
+def test_body_under_the_limit_is_passed_on(client):
+    response = client.post("/predict", files={"file": ("scan.png", b"x" * 100)})
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_declared_length_over_the_limit_is_refused(client):
+    response = client.post("/predict", files={"file": ("scan.png", b"x" * (2 * LIMIT))})
+
+    assert response.status_code == 413
+
+
+def test_chunked_body_over_the_limit_is_cut_off(client):
+    body = (
+        b"--boundary\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="scan.png"\r\n\r\n'
+        + b"x" * (4 * LIMIT) + b"\r\n--boundary--\r\n"
+    )
+
+    def chunks():
+        for start in range(0, len(body), LIMIT // 2):
+            yield body[start:start + LIMIT // 2]
+
+    # a generator body is sent with Transfer-Encoding: chunked and no Content-Length
+    response = client.post("/predict", content=chunks(),
+                           headers={"Content-Type": "multipart/form-data; boundary=boundary"})
+
+    assert response.status_code == 413
+
+
+def test_read_upload_returns_a_file_within_the_limit():
+    assert read_upload(UploadFile(io.BytesIO(b"scan"), filename="scan.png"), max_size=4) == b"scan"
+
+
+@pytest.mark.parametrize("size", [5, None], ids=["declared", "undeclared"])
+def test_read_upload_refuses_a_file_over_the_limit(size):
+    upload = UploadFile(io.BytesIO(b"scans"), filename="scan.png", size=size)
+
+    with pytest.raises(UploadTooLarge):
+        read_upload(upload, max_size=4)